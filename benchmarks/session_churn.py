@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Benchmark session engines under login/logout churn.
+
+Each cycle does what ``LoginView`` and ``LogoutView`` do to a session:
+``cycle_key`` + save on login, ``flush`` on logout. Compares ``db``,
+``cached_db`` and ``rest_auth.contrib.sessions``, counting queries.
+(buffered writes are flushed at the end, timed separately, and their
+queries are counted)
+
+.. code-block:: bash
+
+    $ python benchmarks/session_churn.py --cycles 5000
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from importlib import import_module
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'rest_auth.contrib.sessions',
+)
+
+
+def run(engine, cycles):
+    from django.db import connection
+    from rest_auth.contrib import sessions
+
+    SessionStore = import_module(engine).SessionStore
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        start = time.time()
+        for i in range(cycles):
+            session = SessionStore()
+            session.cycle_key()  # login
+            session['_auth_user_id'] = str(i)
+            session.save()
+
+            session = SessionStore(session.session_key)
+            session['_auth_user_id']  # an authenticated request
+            session.flush()  # logout
+        elapsed = time.time() - start
+
+        # NOTE buffered writes are counted, too.
+        start = time.time()
+        sessions.flush()
+        flushed = time.time() - start
+
+    return elapsed, flushed, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=2000)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    settings.configure(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'django.contrib.sessions',
+            'rest_framework',
+            'rest_auth',
+        ],
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': os.path.join(path, 'db.sqlite3'),
+            },
+        },
+        REST_AUTH_SESSION_FLUSH_INTERVAL=3600,
+    )
+    django.setup()
+
+    from django.core.cache import cache
+    from django.core.management import call_command
+
+    call_command('migrate', verbosity=0)
+
+    print('%-45s %9s %9s %10s %9s' % (
+        'engine', 'seconds', 'flush', 'cycles/s', 'queries',
+    ))
+    try:
+        for engine in ENGINES:
+            cache.clear()
+            elapsed, flushed, queries = run(engine, args.cycles)
+            print('%-45s %9.3f %9.3f %10.1f %9d' % (
+                engine, elapsed, flushed, args.cycles / elapsed, queries,
+            ))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
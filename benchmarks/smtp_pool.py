@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""Benchmark django's SMTP backend against ``PooledEmailBackend``.
+
+Messages are sent to a local SMTP stand-in, one message per ``send()``
+(as verification & password-reset mails are sent), and in batches with
+``send_messages``.
+
+.. code-block:: bash
+
+    $ python benchmarks/smtp_pool.py --messages 500 --connect-latency 0.01
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+from smtp_server import SMTPServer  # noqa: E402
+
+BACKENDS = (
+    ('smtp', 'django.core.mail.backends.smtp.EmailBackend'),
+    ('pooled', 'rest_auth.contrib.mail.backends.PooledEmailBackend'),
+)
+
+
+def run(backend, messages, batch_size):
+    from django.core.mail import EmailMessage, get_connection
+
+    def build():
+        return EmailMessage(
+            'Verify your email', 'body', 'from@localhost', ['to@localhost'],
+        )
+
+    start = time.time()
+    if batch_size <= 1:
+        for _ in range(messages):
+            build().send()
+    else:
+        connection = get_connection(backend)
+        for i in range(0, messages, batch_size):
+            count = min(batch_size, messages - i)
+            connection.send_messages([build() for _ in range(count)])
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument(
+        '--connect-latency', type=float, default=0.005,
+        help='seconds the stand-in waits before greeting a new connection.',
+    )
+    args = parser.parse_args()
+
+    server = SMTPServer(connect_latency=args.connect_latency).start()
+    settings.configure(
+        EMAIL_HOST='127.0.0.1', EMAIL_PORT=server.port,
+        REST_AUTH_EMAIL_POOL_SIZE=4, REST_AUTH_EMAIL_POOL_MAX_IDLE=30,
+    )
+    django.setup()
+
+    print('%-8s %-10s %10s %10s' % ('backend', 'mode', 'seconds', 'msg/s'))
+    for name, backend in BACKENDS:
+        settings.EMAIL_BACKEND = backend
+        for mode, batch_size in (('send', 1), ('batch', args.batch_size)):
+            elapsed = run(backend, args.messages, batch_size)
+            print('%-8s %-10s %10.3f %10.1f' % (
+                name, mode, elapsed, args.messages / elapsed,
+            ))
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
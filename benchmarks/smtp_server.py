@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""A tiny SMTP stand-in for benchmarks.
+
+It accepts every message and throws it away. ``connect_latency`` delays
+the greeting to simulate the cost of connecting. (e.g. TLS handshake)
+"""
+from __future__ import unicode_literals
+
+import socketserver
+import threading
+import time
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode('ascii') + b'\r\n')
+
+    def handle(self):
+        time.sleep(self.server.connect_latency)
+        self.reply('220 localhost ESMTP stand-in')
+
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command == b'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                for data in self.rfile:
+                    if data == b'.\r\n':
+                        break
+                self.server.received += 1
+                self.reply('250 OK')
+            elif command == b'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                # HELO, MAIL, RCPT, NOOP, RSET
+                self.reply('250 OK')
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_latency=0):
+        socketserver.ThreadingTCPServer.__init__(
+            self, ('127.0.0.1', 0), SMTPHandler,
+        )
+        self.connect_latency = connect_latency
+        self.received = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
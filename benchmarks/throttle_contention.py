@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""Benchmark contention cost of throttle backends.
+
+Worker processes increment a few hot counters at once, as gunicorn
+workers do when one client hammers ``/login/``. Compares
+``CacheBackend`` (local-memory & file-based cache) with
+``SharedMemoryBackend``, and checks that no increment is lost.
+
+.. code-block:: bash
+
+    $ python benchmarks/throttle_contention.py --workers 16 --ops 2000
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def get_backend(name, path):
+    from rest_auth.throttling import CacheBackend
+    from rest_auth.contrib.throttling import SharedMemoryBackend
+    from django.core.cache import caches
+
+    if name == 'shm':
+        return SharedMemoryBackend(os.path.join(path, 'shm'))
+
+    backend = CacheBackend()
+    backend.cache = caches[name]
+    return backend
+
+
+def work(name, path, keys, ops, barrier):
+    backend = get_backend(name, path)
+    barrier.wait()
+    for i in range(ops):
+        backend.incr('rest_auth:throttle:login:%d' % (i % keys), 120)
+
+
+def run(name, path, workers, keys, ops):
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(workers + 1)
+    processes = [
+        context.Process(target=work, args=(name, path, keys, ops, barrier))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    barrier.wait()
+    start = time.time()
+    for process in processes:
+        process.join()
+    elapsed = time.time() - start
+
+    backend = get_backend(name, path)
+    counted = sum(
+        backend.get('rest_auth:throttle:login:%d' % i) for i in range(keys)
+    )
+    return elapsed, counted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=2000)
+    parser.add_argument('--keys', type=int, default=4)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    settings.configure(
+        SECRET_KEY='benchmark',
+        CACHES={
+            'locmem': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'filebased': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': os.path.join(path, 'cache'),
+            },
+        },
+    )
+    django.setup()
+
+    total = args.workers * args.ops
+    print('%-10s %10s %12s %10s' % ('backend', 'seconds', 'incr/s', 'lost'))
+    try:
+        for name in ('locmem', 'filebased', 'shm'):
+            elapsed, counted = run(
+                name, path, args.workers, args.keys, args.ops,
+            )
+            print('%-10s %10.3f %12.1f %10d' % (
+                name, elapsed, total / elapsed, total - counted,
+            ))
+    finally:
+        shutil.rmtree(path)
+
+    print('\n(locmem counters are per-process, so they are all "lost")')
+
+
+if __name__ == '__main__':
+    main()
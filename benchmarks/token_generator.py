@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Benchmark link token generators.
+
+Makes and checks ``--tokens`` tokens with django's
+``default_token_generator`` and ``rest_auth.tokens``'s, which derives
+its HMAC keys once. (with 1 and 3 secrets, as during a rotation)
+
+.. code-block:: bash
+
+    $ python benchmarks/token_generator.py --tokens 100000
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def run(generator, user, count):
+    start = time.time()
+    tokens = [generator.make_token(user) for _ in range(count)]
+    made = time.time() - start
+
+    start = time.time()
+    for token in tokens:
+        assert generator.check_token(user, token)
+    checked = time.time() - start
+
+    return made, checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tokens', type=int, default=20000)
+    args = parser.parse_args()
+
+    settings.configure(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'rest_framework',
+            'rest_auth',
+        ],
+    )
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.tokens import default_token_generator
+    from rest_auth.tokens import TokenGenerator
+
+    user = get_user_model()(pk=1, username='user', password='!unusable')
+    rotating = TokenGenerator()
+    # checks fall through to the last secret in the worst case.
+    rotating.secrets = ['new', 'previous', 'benchmark']
+
+    generators = (
+        ('django', default_token_generator),
+        ('rest_auth', TokenGenerator()),
+        ('rest_auth (3 secrets)', rotating),
+    )
+
+    print('%-22s %12s %12s' % ('generator', 'make/s', 'check/s'))
+    for name, generator in generators:
+        made, checked = run(generator, user, args.tokens)
+        print('%-22s %12.1f %12.1f' % (
+            name, args.tokens / made, args.tokens / checked,
+        ))
+
+
+if __name__ == '__main__':
+    main()
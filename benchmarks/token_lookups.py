@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""Benchmark opaque token lookups with and without cache.
+
+Authenticates ``--requests`` requests with a few tokens, and counts
+database queries & time with ``REST_AUTH_TOKEN_CACHE_TIMEOUT`` set
+and with it ``0``. (no caching)
+
+.. code-block:: bash
+
+    $ python benchmarks/token_lookups.py --requests 10000 --tokens 10
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import django  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+
+def run(tokens, requests):
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory
+    from rest_auth.authentication import OpaqueTokenAuthentication
+
+    factory = APIRequestFactory()
+    authentication = OpaqueTokenAuthentication()
+    headers = ['Token %s' % token for token in tokens]
+    queries = []
+
+    def count(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count):
+        start = time.time()
+        for i in range(requests):
+            request = factory.get(
+                '/', HTTP_AUTHORIZATION=headers[i % len(headers)],
+            )
+            authentication.authenticate(request)
+        elapsed = time.time() - start
+
+    return elapsed, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--tokens', type=int, default=10)
+    args = parser.parse_args()
+
+    settings.configure(
+        SECRET_KEY='benchmark',
+        INSTALLED_APPS=[
+            'django.contrib.auth',
+            'django.contrib.contenttypes',
+            'rest_framework',
+            'rest_auth',
+        ],
+        DATABASES={
+            'default': {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'NAME': ':memory:',
+            },
+        },
+    )
+    django.setup()
+
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.core.management import call_command
+    from django.test.utils import override_settings
+    from rest_auth.authentication import make_opaque_token
+
+    call_command('migrate', verbosity=0)
+    UserModel = get_user_model()
+    tokens = [
+        make_opaque_token(UserModel._default_manager.create_user(
+            username='user-%d' % i, password='pass',
+        ))
+        for i in range(args.tokens)
+    ]
+
+    print('%-10s %10s %12s %10s' % ('cache', 'seconds', 'auth/s', 'queries'))
+    for name, timeout in (('off', 0), ('on', 300)):
+        cache.clear()
+        with override_settings(REST_AUTH_TOKEN_CACHE_TIMEOUT=timeout):
+            elapsed, queries = run(tokens, args.requests)
+        print('%-10s %10.3f %12.1f %10d' % (
+            name, elapsed, args.requests / elapsed, queries,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -34,9 +34,20 @@ Below API endpoints can be re-configured if you write your urls.py
 
     authenticate user and persist him/her to website
 
+    (responds with ``access`` and ``refresh`` tokens if you set
+    ``REST_AUTH_LOGIN_MODE = 'signed'``)
+
+* POST /token/refresh/
+    * refresh
+
+    issue a new access token from a refresh token
+
 * POST /logout/
     let a user logged out.
 
+* POST /logout/all/
+    let a user logged out of all devices.
+
 .. NOTE::
     Logout from HTTP GET is not implemented.
 
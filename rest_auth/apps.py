@@ -15,6 +15,8 @@ class AppConfig(apps.AppConfig):
 
     def ready(self):
         # enroll default settings to django.conf.settings
+        # NOTE rest_auth reads settings through ``rest_auth.conf``.
+        # This is kept for projects reading ``settings.REST_AUTH_*``.
         for name in filter(self._is_my_setting, dir(default_settings)):
             if not hasattr(settings, name):
                 setattr(settings, name, getattr(default_settings, name))
@@ -22,4 +24,8 @@ class AppConfig(apps.AppConfig):
                 # NOTE if settings has `REST_AUTH_*`, do nothing.
                 pass
 
+        # connects receivers of ``user_logged_in`` & ``user_logged_out``,
+        # and of user's ``post_save`` & ``pre_delete``.
+        from . import authentication, sessions  # noqa: F401
+
         return super(AppConfig, self).ready()
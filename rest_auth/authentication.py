@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""Token authentication for API clients.
+
+Signed tokens
+-------------
+
+Set ``REST_AUTH_LOGIN_MODE = 'signed'``, and ``LoginView`` responds with
+a short-lived access token and a refresh token, instead of logging in
+to a session. Tokens are signed with ``django.core.signing``.
+
+Add ``SignedTokenAuthentication`` to rest_framework's
+``DEFAULT_AUTHENTICATION_CLASSES`` to authenticate requests with::
+
+    Authorization: Bearer <access token>
+
+Access tokens are verified without database or session. ``request.user``
+is a ``TokenUser`` built from the token. (``TokenUser.user`` loads the
+user from database if you need it, as ``PasswordChangeView`` and
+``LogoutAllView`` do. see ``get_database_user``)
+
+Get a new access token from ``/token/refresh/`` with a refresh token.
+Refresh tokens are invalidated only when the user changes password.
+(``LogoutAllView`` doesn't, as signed tokens are not stored)
+
+Opaque tokens
+-------------
+
+Set ``REST_AUTH_LOGIN_MODE = 'token'``, and ``LoginView`` responds with
+a random ``token``, stored in ``AuthToken`` table. Tokens can be revoked,
+and they are revoked by ``LogoutView`` and password changes.
+
+Add ``OpaqueTokenAuthentication`` to rest_framework's
+``DEFAULT_AUTHENTICATION_CLASSES`` to authenticate requests with::
+
+    Authorization: Token <token>
+
+Lookups are cached in django's default cache for
+``REST_AUTH_TOKEN_CACHE_TIMEOUT`` seconds, and unknown tokens for
+``REST_AUTH_TOKEN_NEGATIVE_CACHE_TIMEOUT`` seconds, so most requests
+don't hit the database. Cached lookups of a user are dropped when the user
+is deleted, or saved with ``password`` or ``is_active``. (``QuerySet.update``
+doesn't, as it sends no signal)
+"""
+from __future__ import unicode_literals
+
+import binascii
+import hashlib
+import os
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes, force_text
+from django.utils.functional import cached_property
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import authentication, exceptions
+
+from .conf import auth_settings
+from .models import AuthToken
+
+UserModel = get_user_model()
+
+ACCESS_TOKEN_SALT = 'rest_auth.authentication.access'
+REFRESH_TOKEN_SALT = 'rest_auth.authentication.refresh'
+
+
+def _get_password_hash(user):
+    return user.get_session_auth_hash()[:16]
+
+
+def make_access_token(user):
+    return signing.dumps({
+        'uid': UserModel._meta.pk.value_to_string(user),
+        'username': user.get_username(),
+        'is_staff': user.is_staff,
+        'is_superuser': user.is_superuser,
+    }, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def make_refresh_token(user):
+    return signing.dumps({
+        'uid': UserModel._meta.pk.value_to_string(user),
+        'hash': _get_password_hash(user),
+    }, salt=REFRESH_TOKEN_SALT, compress=True)
+
+
+def make_signed_tokens(user):
+    """:return: a dict of ``access`` and ``refresh`` tokens
+    """
+    return {
+        'access': make_access_token(user),
+        'refresh': make_refresh_token(user),
+    }
+
+
+def load_refresh_token(token):
+    """Verifies a refresh token.
+
+    :return: the user of the token
+    :exception BadSignature: token is invalid, expired or revoked.
+    """
+    payload = signing.loads(
+        token, salt=REFRESH_TOKEN_SALT,
+        max_age=auth_settings.SIGNED_TOKEN_REFRESH_LIFETIME,
+    )
+
+    try:
+        user = UserModel._default_manager.get(
+            pk=UserModel._meta.pk.to_python(payload['uid']),
+        )
+    except (UserModel.DoesNotExist, KeyError, ValidationError):
+        raise signing.BadSignature('User does not exist.')
+
+    if not user.is_active or \
+            payload.get('hash') != _get_password_hash(user):
+        raise signing.BadSignature('Token is revoked.')
+
+    return user
+
+
+class TokenUser(object):
+    """A user authenticated by signed access token.
+
+    It has attributes stored in the token only. (``pk``, ``username``,
+    ``is_staff`` & ``is_superuser``)
+    """
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, payload):
+        self.pk = self.id = UserModel._meta.pk.to_python(payload['uid'])
+        self.username = payload.get('username', '')
+        self.is_staff = payload.get('is_staff', False)
+        self.is_superuser = payload.get('is_superuser', False)
+
+    def __str__(self):
+        return self.username
+
+    def get_username(self):
+        return self.username
+
+    @cached_property
+    def user(self):
+        """User instance from database.
+        """
+        return UserModel._default_manager.get(pk=self.pk)
+
+    def has_perm(self, perm, obj=None):
+        return self.user.has_perm(perm, obj)
+
+    def has_perms(self, perm_list, obj=None):
+        return self.user.has_perms(perm_list, obj)
+
+    def has_module_perms(self, module):
+        return self.user.has_module_perms(module)
+
+
+def get_database_user(user):
+    """:return: ``user``, or the user of a ``TokenUser`` from database.
+    (for views which save the user or filter by it)
+
+    :exception AuthenticationFailed: if the user is inactive or deleted.
+    """
+    if not isinstance(user, TokenUser):
+        return user
+
+    try:
+        user = user.user
+    except UserModel.DoesNotExist:
+        user = None
+    if user is None or not user.is_active:
+        raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+    return user
+
+
+class SignedTokenAuthentication(authentication.BaseAuthentication):
+    """Authenticates ``Authorization: Bearer <access token>``.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or force_text(auth[0]).lower() != self.keyword.lower():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header.')
+            )
+
+        token = force_text(auth[1])
+        try:
+            payload = signing.loads(
+                token, salt=ACCESS_TOKEN_SALT,
+                max_age=auth_settings.SIGNED_TOKEN_ACCESS_LIFETIME,
+            )
+            user = TokenUser(payload)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed(_('Token expired.'))
+        except (signing.BadSignature, KeyError, ValidationError):
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        return user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+TOKEN_CACHE_KEY = 'rest_auth:token:%s'
+INVALID_TOKEN = 'invalid'
+"""Cached for unknown tokens. (negative caching)
+"""
+
+TOKEN_CACHE_FIELDS = frozenset(['password', 'is_active'])
+"""Fields of a user, whose partial save drops cached lookups.
+"""
+
+
+def _get_token_digest(key):
+    return hashlib.sha256(force_bytes(key)).hexdigest()
+
+
+def make_opaque_token(user):
+    """Creates an opaque token for a user.
+
+    :return: the token. (only its digest is stored)
+    """
+    key = binascii.hexlify(os.urandom(20)).decode()
+    digest = _get_token_digest(key)
+    AuthToken.objects.create(digest=digest, user=user)
+    cache.delete(TOKEN_CACHE_KEY % digest)
+    return key
+
+
+def load_opaque_token(key):
+    """Looks up a token, from cache first.
+
+    :return: user of the token or ``None``.
+    """
+    digest = _get_token_digest(key)
+    cache_key = TOKEN_CACHE_KEY % digest
+
+    user = cache.get(cache_key)
+    if user is not None:
+        return None if user == INVALID_TOKEN else user
+
+    try:
+        user = AuthToken.objects.select_related('user').get(
+            digest=digest,
+        ).user
+    except AuthToken.DoesNotExist:
+        cache.set(
+            cache_key, INVALID_TOKEN,
+            auth_settings.TOKEN_NEGATIVE_CACHE_TIMEOUT,
+        )
+        return None
+
+    cache.set(cache_key, user, auth_settings.TOKEN_CACHE_TIMEOUT)
+    return user
+
+
+def revoke_opaque_token(key):
+    digest = _get_token_digest(key)
+    AuthToken.objects.filter(digest=digest).delete()
+    cache.delete(TOKEN_CACHE_KEY % digest)
+
+
+def revoke_user_tokens(user, keep=None):
+    """Revokes all opaque tokens of a user, except ``keep`` (a token).
+    """
+    tokens = AuthToken.objects.filter(user=user)
+    if keep:
+        tokens = tokens.exclude(digest=_get_token_digest(keep))
+    digests = list(tokens.values_list('digest', flat=True))
+    if digests:
+        tokens.delete()
+        cache.delete_many([TOKEN_CACHE_KEY % digest for digest in digests])
+
+
+def clear_user_tokens_cache(user):
+    """Drops cached lookups of all opaque tokens of a user.
+    """
+    digests = AuthToken.objects.filter(user=user).values_list(
+        'digest', flat=True,
+    )
+    cache.delete_many([TOKEN_CACHE_KEY % digest for digest in digests])
+
+
+@receiver(post_save, sender=UserModel)
+def clear_tokens_cache_on_save(sender, instance, created, update_fields,
+                               **kwargs):
+    # NOTE no tokens are issued unless ``LOGIN_MODE`` is ``'token'``, and
+    # partial saves (e.g. ``update_last_login``) only matter if they change
+    # what authentication checks.
+    if created or auth_settings.LOGIN_MODE != 'token':
+        return
+    if update_fields is not None and \
+            not update_fields & TOKEN_CACHE_FIELDS:
+        return
+    clear_user_tokens_cache(instance)
+
+
+@receiver(pre_delete, sender=UserModel)
+def clear_tokens_cache_on_delete(sender, instance, **kwargs):
+    clear_user_tokens_cache(instance)
+
+
+def get_request_token(request):
+    """:return: opaque token ``request`` is authenticated with, or ``None``.
+    """
+    authenticator = getattr(request, 'successful_authenticator', None)
+    if isinstance(authenticator, OpaqueTokenAuthentication):
+        return request.auth
+    return None
+
+
+class OpaqueTokenAuthentication(authentication.BaseAuthentication):
+    """Authenticates ``Authorization: Token <token>``.
+    """
+    keyword = 'Token'
+
+    def authenticate(self, request):
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or force_text(auth[0]).lower() != self.keyword.lower():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header.')
+            )
+
+        token = force_text(auth[1])
+        user = load_opaque_token(token)
+        if user is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(
+                _('User inactive or deleted.')
+            )
+
+        return user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Authentication backend that hashes through ``rest_auth.hashing``.
+
+.. code-block:: python
+
+    AUTHENTICATION_BACKENDS = ['rest_auth.backends.ModelBackend']
+
+Same as django's ``ModelBackend``, except that only the password hasher
+runs in ``REST_AUTH_HASHING_EXECUTOR``. The user is fetched (and its hash
+upgraded) in the calling thread.
+"""
+from __future__ import unicode_literals
+
+from django.contrib.auth import backends, get_user_model, hashers
+
+from . import hashing
+
+UserModel = get_user_model()
+
+
+class ModelBackend(backends.ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # NOTE hashes once to reduce the timing difference between
+            # an existing and a nonexistent user, like django.
+            hashing.run(hashers.make_password, password)
+            return None
+
+        if hashing.check_password(user, password) and \
+                self.user_can_authenticate(user):
+            return user
+        return None
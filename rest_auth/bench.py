@@ -0,0 +1,414 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of rest_auth's endpoints. (``manage.py rest_auth_bench``)
+
+Each scenario sends requests to an endpoint with django's test client,
+and measures latency & queries of each request. Preparations (e.g.
+logging in before logging out) are not measured.
+
+Users are generated by ``create_users``, which inserts them by
+``bulk_create`` with one precomputed password hash, so millions of users
+can be generated in minutes.
+
+Memory of requests is measured by ``run_memory``. (with ``tracemalloc``)
+``rest_auth/tests/memory_baseline.json`` is the baseline of
+``rest_auth.tests.test_memory``, which runs only with
+``REST_AUTH_MEMORY_BASELINE=1`` (``tox -e memory``, on the interpreter &
+versions pinned there), because byte counts differ between python &
+library versions. Update it with ``REST_AUTH_MEMORY_BASELINE=record tox -e
+memory``, when a change is meant to use more memory.
+"""
+from __future__ import division, unicode_literals
+
+import gc
+import json
+import random
+import tracemalloc
+from collections import OrderedDict
+from timeit import default_timer
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from .tokens import default_token_generator
+
+UserModel = get_user_model()
+
+USERNAME_FORMAT = 'bench-%d'
+EMAIL_FORMAT = 'bench-%d@example.com'
+PASSWORD = 'bench-password-1'
+NEW_PASSWORD = 'bench-password-2'
+
+HASHERS = OrderedDict([
+    ('fast', ['django.contrib.auth.hashers.MD5PasswordHasher']),
+    ('production', None),  # PASSWORD_HASHERS of the project
+])
+
+
+def create_users(count, batch_size=10000, start=0):
+    """Inserts ``count`` users named ``bench-<n>``.
+
+    Passwords are all ``PASSWORD``, hashed once.
+
+    :return: number of created users
+    """
+    password = make_password(PASSWORD)
+    manager = UserModel._default_manager
+    email_field_name = UserModel.get_email_field_name()
+
+    created = 0
+    for offset in range(start, start + count, batch_size):
+        users = [
+            UserModel(**{
+                UserModel.USERNAME_FIELD: USERNAME_FORMAT % i,
+                email_field_name: EMAIL_FORMAT % i,
+                'password': password,
+            })
+            for i in range(offset, min(offset + batch_size, start + count))
+        ]
+        with transaction.atomic():
+            manager.bulk_create(users)
+        created += len(users)
+    return created
+
+
+def get_bench_users():
+    """:return: users created by ``create_users``.
+    """
+    return UserModel._default_manager.filter(**{
+        '%s__startswith' % UserModel.USERNAME_FIELD: 'bench-',
+    })
+
+
+def reset_passwords():
+    """Sets ``PASSWORD`` of all bench users, hashed by the current hasher.
+    """
+    return get_bench_users().update(password=make_password(PASSWORD))
+
+
+class Scenario(object):
+    """Requests to an endpoint.
+
+    Subclasses implement ``prepare`` (not measured) and ``request``.
+    """
+    name = None
+
+    def __init__(self, users):
+        self.users = users
+        self.client = Client()
+
+    def get_user(self, i):
+        return self.users[i % len(self.users)]
+
+    def prepare(self, i):
+        pass
+
+    def request(self, i):
+        raise NotImplementedError('.request() must be overridden')
+
+
+class LoginScenario(Scenario):
+    name = 'login'
+
+    def prepare(self, i):
+        self.client.cookies.clear()
+
+    def request(self, i):
+        return self.client.post(reverse('rest_auth:login'), {
+            'username': self.get_user(i).get_username(),
+            'password': PASSWORD,
+        })
+
+
+class LogoutScenario(Scenario):
+    name = 'logout'
+
+    def prepare(self, i):
+        self.client.force_login(self.get_user(i))
+
+    def request(self, i):
+        return self.client.post(reverse('rest_auth:logout'))
+
+
+class ForgotScenario(Scenario):
+    name = 'forgot'
+
+    def request(self, i):
+        user = self.get_user(i)
+        return self.client.post(reverse('rest_auth:forgot'), {
+            'email': getattr(user, UserModel.get_email_field_name()),
+        })
+
+
+class SignupScenario(Scenario):
+    name = 'signup'
+
+    def __init__(self, users):
+        super(SignupScenario, self).__init__(users)
+        # NOTE not `bench-`, which is the prefix of `get_bench_users`.
+        self.prefix = 'signup-%x-' % random.getrandbits(32)
+
+    def request(self, i):
+        return self.client.post(reverse('rest_auth:signup'), {
+            'username': self.prefix + str(i),
+            'email': self.prefix + '%d@example.com' % i,
+            'password1': PASSWORD,
+            'password2': PASSWORD,
+        })
+
+
+class PasswordChangeScenario(Scenario):
+    name = 'password_change'
+
+    def __init__(self, users):
+        super(PasswordChangeScenario, self).__init__(users)
+        self.password = make_password(PASSWORD)
+
+    def prepare(self, i):
+        user = self.get_user(i)
+        user.password = self.password
+        UserModel._default_manager.filter(pk=user.pk).update(
+            password=self.password,
+        )
+        self.client.force_login(user)
+
+    def request(self, i):
+        return self.client.post(reverse('rest_auth:password_change'), {
+            'old_password': PASSWORD,
+            'new_password1': NEW_PASSWORD,
+            'new_password2': NEW_PASSWORD,
+        })
+
+
+class VerificationScenario(Scenario):
+    name = 'verification'
+
+    def prepare(self, i):
+        user = self.get_user(i)
+        # NOTE password may be changed by other scenarios.
+        user.refresh_from_db()
+        self.url = reverse('rest_auth:verify_email_confirm', kwargs={
+            'uidb64': urlsafe_base64_encode(force_bytes(user.pk)),
+            'token': default_token_generator.make_token(user),
+        })
+
+    def request(self, i):
+        return self.client.get(self.url)
+
+
+SCENARIOS = OrderedDict((scenario.name, scenario) for scenario in (
+    LoginScenario, LogoutScenario, ForgotScenario, SignupScenario,
+    PasswordChangeScenario, VerificationScenario,
+))
+
+
+def percentile(values, percent):
+    """:param values: sorted values
+    """
+    if not values:
+        return 0.0
+    return values[int(round((len(values) - 1) * percent / 100))]
+
+
+def run_scenario(scenario, requests):
+    """Sends requests of a scenario.
+
+    :return: a dict of ``requests``, ``rps``, ``p50``, ``p99`` (seconds),
+        ``queries`` (per request) and ``errors``. (non-2xx/3xx responses)
+    """
+    queries = [0]
+
+    def count(execute, sql, params, many, context):
+        queries[0] += 1
+        return execute(sql, params, many, context)
+
+    latencies = []
+    measured_queries = errors = 0
+    for i in range(requests):
+        scenario.prepare(i)
+
+        queries[0] = 0
+        with connection.execute_wrapper(count):
+            started_at = default_timer()
+            response = scenario.request(i)
+            latencies.append(default_timer() - started_at)
+        measured_queries += queries[0]
+
+        if response.status_code >= 400:
+            errors += 1
+
+    total = sum(latencies)
+    latencies.sort()
+    return {
+        'requests': requests,
+        'rps': requests / total if total else 0.0,
+        'p50': percentile(latencies, 50),
+        'p99': percentile(latencies, 99),
+        'queries': measured_queries / requests if requests else 0.0,
+        'errors': errors,
+    }
+
+
+def measure_memory(scenario, requests, warmup=5):
+    """Measures allocations of requests with ``tracemalloc``.
+
+    ``warmup`` requests are sent first, so one-time allocations (e.g.
+    imports & caches) are not measured. Allocations of ``prepare`` are
+    not measured either.
+
+    :return: a dict of ``requests``, ``peak`` (median of peak bytes
+        allocated during each request) and ``retained`` (median of bytes
+        still allocated after each request. a leak retains bytes in every
+        request, while e.g. resizing a dict doesn't.)
+    """
+    for i in range(warmup):
+        scenario.prepare(i)
+        scenario.request(i)
+
+    peaks = []
+    retained = []
+    for i in range(warmup, warmup + requests):
+        scenario.prepare(i)
+        gc.collect()
+
+        # NOTE tracing is restarted for each request, so only allocations
+        # of the request are traced. (``tracemalloc.reset_peak`` is 3.9+)
+        tracemalloc.start()
+        try:
+            response = scenario.request(i)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+
+            del response
+            gc.collect()
+            retained.append(tracemalloc.get_traced_memory()[0])
+        finally:
+            tracemalloc.stop()
+
+    peaks.sort()
+    retained.sort()
+    return {
+        'requests': requests,
+        'peak': percentile(peaks, 50),
+        'retained': percentile(retained, 50),
+    }
+
+
+def get_settings(hasher):
+    """:return: settings to run scenarios with ``HASHERS[hasher]``.
+    (throttling is disabled, emails are not sent, and queries are not
+    logged as in production)
+    """
+    options = {
+        'DEBUG': False,
+        'REST_AUTH_THROTTLE_RATES': {},
+        'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+    }
+    if HASHERS[hasher]:
+        options['PASSWORD_HASHERS'] = HASHERS[hasher]
+    return options
+
+
+def get_users(sample):
+    ids = list(get_bench_users().values_list('pk', flat=True)[:sample])
+    if not ids:
+        raise ValueError('No bench users. (see `create_users`)')
+
+    reset_passwords()
+    users = list(UserModel._default_manager.filter(pk__in=ids))
+    random.shuffle(users)
+    return users
+
+
+def run(scenarios=None, hashers=None, requests=100, sample=1000):
+    """Runs scenarios with each hasher.
+
+    Throttling is disabled, and emails are not sent.
+
+    :param scenarios: names of ``SCENARIOS`` (default: all)
+    :param hashers: names of ``HASHERS`` (default: all)
+    :param sample: number of bench users to send requests with
+    :return: a list of ``(hasher, scenario, result of run_scenario)``
+    """
+    scenarios = scenarios or list(SCENARIOS)
+    hashers = hashers or list(HASHERS)
+
+    results = []
+    for hasher in hashers:
+        with override_settings(**get_settings(hasher)):
+            users = get_users(sample)
+            for name in scenarios:
+                result = run_scenario(SCENARIOS[name](users), requests)
+                results.append((hasher, name, result))
+
+    return results
+
+
+def run_memory(scenarios=None, requests=20, sample=100):
+    """Measures memory of scenarios with ``'fast'`` hasher.
+
+    :return: a dict of scenario name to result of ``measure_memory``
+    """
+    scenarios = scenarios or list(SCENARIOS)
+
+    results = OrderedDict()
+    with override_settings(**get_settings('fast')):
+        users = get_users(sample)
+        for name in scenarios:
+            results[name] = measure_memory(SCENARIOS[name](users), requests)
+
+    return results
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    """Writes ``peak`` & ``retained`` of ``run_memory`` results.
+    """
+    baseline = OrderedDict(
+        (name, OrderedDict([
+            ('peak', result['peak']), ('retained', result['retained']),
+        ]))
+        for name, result in results.items()
+    )
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def compare_baseline(results, baseline, tolerance=0.25, slack=1024):
+    """Compares ``run_memory`` results with a baseline.
+
+    Peaks may be ``tolerance`` over the baseline. Retained bytes may be
+    ``slack`` over the baseline. They are a few KB per request even
+    without leaks (e.g. entries left in caches), so a fixed slack catches
+    a leak of a few objects per request, where a ratio wouldn't.
+
+    :return: a list of error messages. (empty if all are in the baseline)
+    """
+    errors = []
+    for name, result in results.items():
+        if name not in baseline:
+            errors.append('%s: no baseline' % name)
+            continue
+
+        limit = int(baseline[name]['peak'] * (1 + tolerance))
+        if result['peak'] > limit:
+            errors.append('%s: peak %d bytes > %d bytes' % (
+                name, result['peak'], limit,
+            ))
+
+        limit = baseline[name]['retained'] + slack
+        if result['retained'] > limit:
+            errors.append('%s: retained %d bytes/request > %d bytes' % (
+                name, result['retained'], limit,
+            ))
+
+    return errors
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Query budgets of views.
+
+rest_auth's views declare ``query_budget``, the number of queries a
+request to the view may run with default settings (and database-backed
+sessions). Transaction control statements (``BEGIN``, ``SAVEPOINT``...)
+are not counted.
+
+Budgets are checked by ``rest_auth.test.QueryBudgetTestMixin`` in tests,
+and by ``rest_auth.middleware.QueryBudgetMiddleware`` in development.
+
+If you customize a view (e.g. its serializer), set ``query_budget`` of
+your subclass.
+"""
+from __future__ import unicode_literals
+
+TRANSACTION_STATEMENTS = (
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT',
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised when a view runs more queries than its ``query_budget``.
+    """
+
+
+def get_query_budget(view):
+    """:param view: a view class, or a function made by ``as_view()``
+    :return: ``query_budget`` of the view, or ``None`` if not declared.
+    """
+    view = getattr(view, 'view_class', view)
+    return getattr(view, 'query_budget', None)
+
+
+def is_counted(sql):
+    """:return: ``False`` for transaction control statements.
+    """
+    return not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS)
+
+
+def check_query_budget(view, queries):
+    """:param queries: a list of sql executed for a request.
+    :exception QueryBudgetExceeded: ``queries`` are over the budget.
+    """
+    budget = get_query_budget(view)
+    if budget is None:
+        return
+
+    queries = [sql for sql in queries if is_counted(sql)]
+    if len(queries) > budget:
+        name = getattr(view, 'view_class', view).__name__
+        raise QueryBudgetExceeded(
+            '%s ran %d queries, over its budget (%d):\n%s' % (
+                name, len(queries), budget,
+                '\n'.join(
+                    '%d. %s' % (i, sql)
+                    for i, sql in enumerate(queries, start=1)
+                ),
+            )
+        )
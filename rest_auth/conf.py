@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Settings object for rest_auth.
+
+``auth_settings`` is a rest_auth version of rest_framework's
+``api_settings``. Settings are accessed without ``REST_AUTH_`` prefix::
+
+    from rest_auth.conf import auth_settings
+
+    auth_settings.LOGIN_SERIALIZER_CLASS  # serializer class, not a str
+
+Values are looked up in your *settings.py* first, then in
+``rest_auth.default_settings``. Each value is resolved once (dotted paths
+in ``IMPORT_STRINGS`` are imported, and ``CHOICES`` are checked) and
+cached until the settings are changed. (e.g. ``override_settings`` in tests)
+"""
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from . import default_settings
+
+IMPORT_STRINGS = (
+    'LOGIN_SERIALIZER_CLASS',
+    'THROTTLE_BACKEND',
+)
+"""Settings which are dotted paths to be imported.
+"""
+
+CHOICES = {
+    'LOGIN_MODE': ('session', 'signed', 'token'),
+}
+"""Settings which must be one of the values.
+"""
+
+
+class AuthSettings(object):
+    """Lazy, cached accessor for ``REST_AUTH_*`` settings.
+    """
+    def __init__(self, defaults, import_strings=IMPORT_STRINGS,
+                 choices=CHOICES):
+        self.defaults = defaults
+        self.prefix = defaults.prefix + '_'
+        self.import_strings = import_strings
+        self.choices = choices
+        self._cached_attrs = set()
+
+    def __getattr__(self, attr):
+        name = self.prefix + attr
+        if attr.startswith('_') or not hasattr(self.defaults, name):
+            raise AttributeError('Invalid rest_auth setting: %r' % attr)
+
+        value = getattr(settings, name, getattr(self.defaults, name))
+        if attr in self.import_strings:
+            value = self.perform_import(value, name)
+        if attr in self.choices and value not in self.choices[attr]:
+            raise ImproperlyConfigured(
+                'Invalid value %r for setting %r. Choose one of %s.' % (
+                    value, name, ', '.join(map(repr, self.choices[attr])),
+                )
+            )
+
+        # Cache the result
+        self._cached_attrs.add(attr)
+        setattr(self, attr, value)
+        return value
+
+    def perform_import(self, value, name):
+        if not isinstance(value, str):
+            return value
+
+        try:
+            return import_string(value)
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                'Could not import %r for setting %r. %s' % (value, name, e)
+            )
+
+    def reload(self):
+        for attr in self._cached_attrs:
+            delattr(self, attr)
+        self._cached_attrs.clear()
+
+
+auth_settings = AuthSettings(default_settings)
+
+
+@receiver(setting_changed)
+def reload_auth_settings(setting, **kwargs):
+    if setting.startswith(auth_settings.prefix):
+        auth_settings.reload()
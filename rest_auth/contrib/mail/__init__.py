@@ -0,0 +1,4 @@
+"""
+rest_auth.contrib.mail
+----------------------
+"""
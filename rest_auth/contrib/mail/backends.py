@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""Email backends for sending many auth mails.
+
+``PooledEmailBackend`` is django's SMTP backend, but it keeps authenticated
+connections open and reuses them across messages (and backend instances).
+Use it if connecting (TLS handshake & login) costs more than sending.
+
+.. code-block:: python
+
+    EMAIL_BACKEND = 'rest_auth.contrib.mail.backends.PooledEmailBackend'
+"""
+from __future__ import unicode_literals
+
+import collections
+import os
+import smtplib
+import socket
+import threading
+import time
+
+from django.core.mail.backends import smtp
+from rest_auth.conf import auth_settings
+
+
+class ConnectionPool(object):
+    """Thread-safe LIFO pool of idle SMTP connections.
+    """
+    def __init__(self, size, max_idle):
+        self.size = size
+        self.max_idle = max_idle
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Pops the most recently used connection.
+        Connections idle longer than ``max_idle`` are closed.
+
+        :return: a connection, or ``None`` if there are no idle connections
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, released_at = self._idle.pop()
+
+            if time.time() - released_at <= self.max_idle:
+                return connection
+            quit_quietly(connection)
+
+    def release(self, connection):
+        """Puts a connection back to the pool.
+
+        :return: ``False`` if the pool is full (connection is not pooled)
+        """
+        with self._lock:
+            if len(self._idle) >= self.size:
+                return False
+            self._idle.append((connection, time.time()))
+            return True
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, collections.deque()
+        for connection, _ in idle:
+            quit_quietly(connection)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key):
+    # NOTE sockets should not be shared with forked processes.
+    key = (os.getpid(), ) + tuple(key)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                auth_settings.EMAIL_POOL_SIZE,
+                auth_settings.EMAIL_POOL_MAX_IDLE,
+            )
+        return _pools[key]
+
+
+def clear_pools():
+    """Closes all pooled connections.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.clear()
+
+
+def quit_quietly(connection):
+    try:
+        connection.quit()
+    except (smtplib.SMTPException, socket.error):
+        connection.close()
+
+
+def is_alive(connection):
+    try:
+        return connection.noop()[0] == 250
+    except (smtplib.SMTPException, socket.error):
+        return False
+
+
+class PooledEmailBackend(smtp.EmailBackend):
+    """SMTP backend reusing pooled connections.
+
+    Connections are pooled per server & credentials, and at most
+    ``REST_AUTH_EMAIL_POOL_SIZE`` idle connections are kept.
+    (Send many messages at once with ``send_messages`` for best results.)
+    """
+    def get_pool(self):
+        return get_pool((
+            self.host, self.port, self.username, self.password,
+            self.use_tls, self.use_ssl,
+        ))
+
+    def open(self):
+        if self.connection:
+            return False
+
+        pool = self.get_pool()
+        connection = pool.acquire()
+        while connection is not None:
+            if is_alive(connection):
+                self.connection = connection
+                return True
+            quit_quietly(connection)
+            connection = pool.acquire()
+
+        return super(PooledEmailBackend, self).open()
+
+    def close(self):
+        """Returns the connection to the pool. (instead of closing it)
+        """
+        if self.connection is None:
+            return
+
+        if self.get_pool().release(self.connection):
+            self.connection = None
+        else:
+            super(PooledEmailBackend, self).close()
+
+    def send_messages(self, email_messages):
+        try:
+            return super(PooledEmailBackend, self).send_messages(
+                email_messages
+            )
+        except Exception:
+            # Connection may be broken. never give it back to the pool.
+            if self.connection is not None:
+                quit_quietly(self.connection)
+                self.connection = None
+            raise
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Write-behind session engine.
+
+Every login (``cycle_key``) and logout (``flush``) writes sessions to
+database. This engine serves sessions from cache, like ``cached_db``, but
+buffers database writes and flushes them in a background thread every
+``REST_AUTH_SESSION_FLUSH_INTERVAL`` seconds, in one transaction.
+
+.. code-block:: python
+
+    SESSION_ENGINE = 'rest_auth.contrib.sessions'
+
+Deleted sessions are marked in cache (for ``SESSION_COOKIE_AGE``) before
+rows are deleted, so a logged-out session can't be loaded again from
+database, even by other processes.
+
+.. NOTE::
+    Writes buffered in a process are lost when it's killed (graceful
+    shutdowns flush them), and other processes read the database only if
+    the cache misses. So use a cache shared by processes, which doesn't
+    evict sessions in ``REST_AUTH_SESSION_FLUSH_INTERVAL``.
+
+    Losing a write only makes a session stale, never more privileged:
+    sessions of a user whose password is changed are still invalidated by
+    ``django.contrib.auth``'s session hash check.
+
+Set ``REST_AUTH_SESSION_FLUSH_INTERVAL = 0`` to write through to database.
+(same as ``cached_db``)
+"""
+from __future__ import unicode_literals
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.base import (
+    CreateError,
+    UpdateError,
+    VALID_KEY_CHARS,
+)
+from django.db import close_old_connections, router, transaction
+from django.utils.crypto import get_random_string
+from rest_auth.conf import auth_settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'rest_auth.contrib.sessions'
+DELETED = 'deleted'
+"""Cached for deleted sessions.
+"""
+CHUNK_SIZE = 500
+
+
+class SessionWriter(object):
+    """Buffers session writes, and flushes them in a background thread.
+
+    Only the last write of a session is kept.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}  # session_key: (model, instance or None)
+        self.thread = None
+
+    def put(self, session_key, model, instance=None):
+        """Buffers a save, or a delete if ``instance`` is ``None``.
+        """
+        with self.lock:
+            self.pending[session_key] = (model, instance)
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='rest_auth-sessions',
+                )
+                self.thread.daemon = True
+                self.thread.start()
+
+    def get(self, session_key):
+        """:return: (``True`` if buffered, instance or ``None``)
+        """
+        with self.lock:
+            if session_key not in self.pending:
+                return False, None
+            return True, self.pending[session_key][1]
+
+    def flush(self):
+        """Writes buffered sessions to database.
+
+        :return: number of written sessions
+        """
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return 0
+
+        try:
+            write(pending)
+        except Exception:
+            with self.lock:
+                # later writes win.
+                pending.update(self.pending)
+                self.pending = pending
+            raise
+
+        return len(pending)
+
+    def run(self):
+        while True:
+            time.sleep(auth_settings.SESSION_FLUSH_INTERVAL or 1)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Failed to flush sessions.')
+            finally:
+                close_old_connections()
+
+
+def write(pending):
+    """Writes ``SessionWriter.pending`` in a transaction per database.
+    """
+    models = {}
+    for session_key, (model, instance) in pending.items():
+        models.setdefault(model, []).append((session_key, instance))
+
+    for model, items in models.items():
+        using = router.db_for_write(model)
+        manager = model._default_manager.db_manager(using)
+        with transaction.atomic(using=using):
+            for start in range(0, len(items), CHUNK_SIZE):
+                _write_chunk(manager, items[start:start + CHUNK_SIZE])
+
+
+def _write_chunk(manager, items):
+    deleted = [key for key, instance in items if instance is None]
+    saved = {key: instance for key, instance in items if instance is not None}
+
+    if deleted:
+        manager.filter(session_key__in=deleted).delete()
+    if not saved:
+        return
+
+    existing = set(manager.filter(
+        session_key__in=list(saved),
+    ).values_list('session_key', flat=True))
+    manager.bulk_create([
+        instance for key, instance in saved.items() if key not in existing
+    ])
+    manager.bulk_update([
+        instance for key, instance in saved.items() if key in existing
+    ], ['session_data', 'expire_date'])
+
+
+writer = SessionWriter()
+atexit.register(writer.flush)
+
+
+def flush():
+    """Writes buffered sessions to database now.
+    """
+    return writer.flush()
+
+
+class SessionStore(cached_db.SessionStore):
+    """Cached sessions, written to database by ``SessionWriter``.
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    @property
+    def write_behind(self):
+        return bool(auth_settings.SESSION_FLUSH_INTERVAL)
+
+    def _get_new_session_key(self):
+        # NOTE uniqueness is checked by `cache.add` in `save`,
+        # not by a query.
+        if not self.write_behind:
+            return super(SessionStore, self)._get_new_session_key()
+        return get_random_string(32, VALID_KEY_CHARS)
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            data = None
+
+        if data == DELETED:
+            self._session_key = None
+            return {}
+        if data is not None:
+            return data
+
+        buffered, instance = writer.get(self.session_key)
+        if not buffered:
+            return super(SessionStore, self).load()
+        if instance is None:
+            self._session_key = None
+            return {}
+        return self.decode(instance.session_data)
+
+    def exists(self, session_key):
+        if not session_key:
+            return False
+
+        data = self._cache.get(self.cache_key_prefix + session_key)
+        if data is not None:
+            return data != DELETED
+
+        buffered, instance = writer.get(session_key)
+        if buffered:
+            return instance is not None
+        return self.model._default_manager.filter(
+            session_key=session_key,
+        ).exists()
+
+    def save(self, must_create=False):
+        if not self.write_behind:
+            return super(SessionStore, self).save(must_create)
+        if self.session_key is None:
+            return self.create()
+
+        data = self._get_session(no_load=must_create)
+        instance = self.create_model_instance(data)
+        timeout = self.get_expiry_age()
+
+        if must_create:
+            if not self._cache.add(self.cache_key, data, timeout):
+                raise CreateError
+        elif self._cache.get(self.cache_key) == DELETED:
+            # deleted by another request
+            raise UpdateError
+        else:
+            self._cache.set(self.cache_key, data, timeout)
+
+        writer.put(self.session_key, self.model, instance)
+
+    def delete(self, session_key=None):
+        if not self.write_behind:
+            return super(SessionStore, self).delete(session_key)
+
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+
+        self._cache.set(
+            self.cache_key_prefix + session_key, DELETED,
+            settings.SESSION_COOKIE_AGE,
+        )
+        writer.put(session_key, self.model)
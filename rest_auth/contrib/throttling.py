@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""Throttle backend for single-host, multi-worker deployments.
+
+``SharedMemoryBackend`` keeps throttle counters in a memory-mapped file,
+so all worker processes on a host (e.g. gunicorn workers) share them
+without a cache server.
+
+.. code-block:: python
+
+    REST_AUTH_THROTTLE_BACKEND = (
+        'rest_auth.contrib.throttling.SharedMemoryBackend'
+    )
+
+The file is a fixed-size hash table of ``REST_AUTH_THROTTLE_SHM_SLOTS``
+slots, split into blocks of 64 slots. Each block has its own lock
+(``fcntl`` byte-range lock + thread lock), so workers only contend when
+they update keys in a same block. When all probed slots of a key are
+in use, the slot expiring first is reused.
+
+.. NOTE::
+    Only for Unix. (``fcntl`` is required)
+"""
+from __future__ import unicode_literals
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.utils.encoding import force_bytes
+from rest_auth.conf import auth_settings
+
+SLOT = struct.Struct('<QQQ')  # fingerprint, expires at, count
+BLOCK_SIZE = 64
+PROBES = 8
+
+
+def get_default_path():
+    # NOTE derived from SECRET_KEY, so projects on a host don't share it.
+    digest = hashlib.md5(force_bytes(settings.SECRET_KEY)).hexdigest()
+    return os.path.join(
+        tempfile.gettempdir(), 'rest_auth-throttle-%s' % digest[:12],
+    )
+
+
+class SharedMemoryBackend(object):
+    """Throttle counters in a memory-mapped file shared by processes.
+    """
+    def __init__(self, path=None, slots=None):
+        self.path = path or auth_settings.THROTTLE_SHM_PATH \
+            or get_default_path()
+        slots = slots or auth_settings.THROTTLE_SHM_SLOTS
+
+        self.num_blocks = max(slots // BLOCK_SIZE, 1)
+        self.size = self.num_blocks * BLOCK_SIZE * SLOT.size
+
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < self.size:
+            os.ftruncate(self.fd, self.size)
+        self.buffer = mmap.mmap(self.fd, self.size)
+        self._thread_locks = [
+            threading.Lock() for _ in range(self.num_blocks)
+        ]
+
+    def close(self):
+        self.buffer.close()
+        os.close(self.fd)
+
+    def _fingerprint(self, key):
+        digest = hashlib.md5(force_bytes(key)).digest()
+        # NOTE 0 means an empty slot.
+        return struct.unpack('<Q', digest[:8])[0] or 1
+
+    def _locate(self, fingerprint):
+        block = fingerprint % self.num_blocks
+        home = (fingerprint // self.num_blocks) % BLOCK_SIZE
+        base = block * BLOCK_SIZE
+        offsets = [
+            (base + (home + i) % BLOCK_SIZE) * SLOT.size
+            for i in range(PROBES)
+        ]
+        return block, offsets
+
+    def _lock(self, block):
+        start = block * BLOCK_SIZE * SLOT.size
+        length = BLOCK_SIZE * SLOT.size
+        return _BlockLock(
+            self.fd, start, length, self._thread_locks[block],
+        )
+
+    def _find(self, fingerprint, offsets, now):
+        """:return: (offset of the live slot or ``None``, offset to reuse)
+        """
+        reusable, reusable_expires = None, None
+        for offset in offsets:
+            slot_fingerprint, expires, _ = SLOT.unpack_from(
+                self.buffer, offset,
+            )
+            if expires <= now:
+                expires = 0
+            elif slot_fingerprint == fingerprint:
+                return offset, None
+
+            if reusable is None or expires < reusable_expires:
+                reusable, reusable_expires = offset, expires
+
+        return None, reusable
+
+    def incr(self, key, timeout):
+        fingerprint = self._fingerprint(key)
+        block, offsets = self._locate(fingerprint)
+
+        with self._lock(block):
+            now = int(time.time())
+            offset, reusable = self._find(fingerprint, offsets, now)
+            if offset is None:
+                SLOT.pack_into(
+                    self.buffer, reusable,
+                    fingerprint, now + int(timeout) + 1, 1,
+                )
+                return 1
+
+            _, expires, count = SLOT.unpack_from(self.buffer, offset)
+            SLOT.pack_into(
+                self.buffer, offset, fingerprint, expires, count + 1,
+            )
+            return count + 1
+
+    def get(self, key):
+        fingerprint = self._fingerprint(key)
+        block, offsets = self._locate(fingerprint)
+
+        with self._lock(block):
+            offset, _ = self._find(fingerprint, offsets, int(time.time()))
+            if offset is None:
+                return 0
+            return SLOT.unpack_from(self.buffer, offset)[2]
+
+
+class _BlockLock(object):
+    """Locks a block against other threads & processes.
+    """
+    def __init__(self, fd, start, length, thread_lock):
+        self.fd = fd
+        self.start = start
+        self.length = length
+        self.thread_lock = thread_lock
+
+    def __enter__(self):
+        self.thread_lock.acquire()
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, self.length, self.start)
+        except Exception:
+            self.thread_lock.release()
+            raise
+
+    def __exit__(self, *exc_info):
+        try:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.length, self.start)
+        finally:
+            self.thread_lock.release()
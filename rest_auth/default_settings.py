@@ -11,6 +11,83 @@ Options for email, which is sent to reset password.
 Detail options guide `here. </>`_
 """
 
+REST_AUTH_EMAIL_OUTBOX = False
+"""Default: ``False``
+
+Set this to ``True`` to queue verification & password-reset emails
+in the database instead of sending them inside a request.
+Queued emails are delivered by ``manage.py rest_auth_outbox``.
+"""
+
+REST_AUTH_EMAIL_OUTBOX_BATCH_SIZE = 100
+"""Default: ``100``
+
+Number of queued emails ``rest_auth_outbox`` sends over one connection.
+"""
+
+REST_AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+"""Default: ``5``
+
+Queued emails are abandoned after this number of failed attempts.
+"""
+
+REST_AUTH_EMAIL_OUTBOX_RETRY_DELAY = 60
+"""Default: ``60``
+
+Seconds to wait before retrying a failed email.
+The delay doubles after each failed attempt.
+"""
+
+REST_AUTH_EMAIL_POOL_SIZE = 4
+"""Default: ``4``
+
+Maximum number of idle SMTP connections kept by
+``rest_auth.contrib.mail.backends.PooledEmailBackend`` per process.
+"""
+
+REST_AUTH_EMAIL_POOL_MAX_IDLE = 30
+"""Default: ``30``
+
+Pooled SMTP connections idle longer than this (in seconds) are closed
+instead of being reused.
+"""
+
+REST_AUTH_EMAIL_TEMPLATE_CACHE = True
+"""Default: ``True``
+
+Email templates are compiled once per process and language.
+Set this to ``False`` during development to see template changes
+without restarting.
+"""
+
+REST_AUTH_HASHING_EXECUTOR = None
+"""Default: ``None``
+
+Executor for password hashing. ``None`` hashes in the calling thread.
+Set ``'thread'`` or ``'process'`` to cap hashing concurrency per process.
+Logins hash through it with ``rest_auth.backends.ModelBackend``.
+(see ``rest_auth.hashing``)
+"""
+
+REST_AUTH_HASHING_MAX_WORKERS = None
+"""Default: ``None``
+
+Number of hashing workers. ``None`` means number of CPUs.
+"""
+
+REST_AUTH_HASHING_MAX_QUEUE = 32
+"""Default: ``32``
+
+Maximum number of hashing calls waiting for a worker.
+"""
+
+REST_AUTH_HASHING_QUEUE_TIMEOUT = 5
+"""Default: ``5``
+
+Seconds to wait when the hashing queue is full.
+Requests are answered with *503 Service Unavailable* after that.
+"""
+
 REST_AUTH_LOGIN_EMPTY_RESPONSE = True
 """Default: ``True``
 
@@ -23,6 +100,157 @@ REST_AUTH_LOGIN_SERIALIZER_CLASS = 'rest_auth.serializers.LoginSerializer'
 Serializer to log in. Update this if you use customized auth backend.
 """
 
+REST_AUTH_THROTTLE_RATES = {
+    'login': None,
+    'forgot': None,
+    'signup': None,
+    'password_change': None,
+}
+"""Default: ``{'login': None, 'forgot': None, 'signup': None,
+'password_change': None}``
+
+Request rates for throttles in ``rest_auth.throttling``. (e.g. ``'5/min'``)
+``None`` disables throttling for the scope.
+
+* ``login``: per username & IP address
+* ``forgot``: per email & IP address
+* ``signup``: per IP address
+* ``password_change``: per user
+"""
+
+REST_AUTH_THROTTLE_BACKEND = 'rest_auth.throttling.CacheBackend'
+"""Default: ``"rest_auth.throttling.CacheBackend"``
+
+Storage of throttle counters. The default one uses django's default cache.
+"""
+
+REST_AUTH_THROTTLE_SHM_PATH = None
+"""Default: ``None``
+
+File shared by ``rest_auth.contrib.throttling.SharedMemoryBackend``.
+``None`` uses a file in the temp directory, named after ``SECRET_KEY``.
+"""
+
+REST_AUTH_THROTTLE_SHM_SLOTS = 65536
+"""Default: ``65536``
+
+Number of counters ``SharedMemoryBackend`` can keep. (24 bytes for each)
+"""
+
+REST_AUTH_LOGIN_MODE = 'session'
+"""Default: ``"session"``
+
+How ``LoginView`` persists an authenticated user.
+
+* ``"session"``: logs in to a session. (``django.contrib.auth.login``)
+* ``"signed"``: responds with signed ``access`` and ``refresh`` tokens.
+  (see ``rest_auth.authentication``)
+* ``"token"``: responds with an opaque ``token``, stored in database.
+"""
+
+REST_AUTH_SIGNED_TOKEN_ACCESS_LIFETIME = 300
+"""Default: ``300``
+
+Seconds signed access tokens are valid for.
+"""
+
+REST_AUTH_SIGNED_TOKEN_REFRESH_LIFETIME = 14 * 24 * 60 * 60
+"""Default: ``1209600`` (14 days)
+
+Seconds signed refresh tokens are valid for.
+"""
+
+REST_AUTH_TOKEN_CACHE_TIMEOUT = 300
+"""Default: ``300``
+
+Seconds opaque token lookups are cached for.
+"""
+
+REST_AUTH_TOKEN_NEGATIVE_CACHE_TIMEOUT = 60
+"""Default: ``60``
+
+Seconds unknown opaque tokens are cached for.
+"""
+
+REST_AUTH_SESSION_FLUSH_INTERVAL = 1
+"""Default: ``1``
+
+Seconds ``rest_auth.contrib.sessions`` buffers session writes for.
+``0`` writes them through to database.
+"""
+
+REST_AUTH_PASSWORD_CHANGE_REVOKE = ('sessions', 'tokens')
+"""Default: ``('sessions', 'tokens')``
+
+Credentials of other devices, revoked when a user changes his/her
+password. The session (or opaque token) which changed the password is
+kept logged in.
+
+* ``'sessions'``: other sessions. (see ``rest_auth.sessions``)
+* ``'tokens'``: other opaque tokens. (``REST_AUTH_LOGIN_MODE = 'token'``)
+
+Sessions not revoked stay logged in. Their session auth hash is refreshed
+through the index of ``rest_auth.sessions``. (sessions logged in before
+the index was installed are logged out by django)
+"""
+
+REST_AUTH_PASSWORD_RESET_COOLDOWN = 0
+"""Default: ``0`` (disabled)
+
+Seconds a password-reset email is not sent again to a same address.
+Requests in cooldown get a same response, but nothing is rendered, queried
+or sent. (counted by ``serializers.get_suppressed_password_resets``)
+"""
+
+REST_AUTH_TOKEN_SECRETS = None
+"""Default: ``None`` (``SECRET_KEY``)
+
+Secrets of ``rest_auth.tokens``. Tokens are made with the first one, and
+checked with all of them. (see "Secret rotation" of ``rest_auth.tokens``)
+"""
+
+REST_AUTH_QUERY_BUDGET_RAISE = False
+"""Default: ``False``
+
+If ``True``, ``rest_auth.middleware.QueryBudgetMiddleware`` raises
+``QueryBudgetExceeded`` for requests over ``query_budget`` of views,
+instead of logging them.
+"""
+
+REST_AUTH_METRICS_VIEW = False
+"""Default: ``False``
+
+Set this to ``True`` to expose metrics of ``rest_auth.metrics`` in
+prometheus' text format at ``metrics/``. (url name: ``rest_auth:metrics``)
+"""
+
+REST_AUTH_PROFILE_DIR = None
+"""Default: ``None``
+
+Directory to write ``cProfile`` profiles of sampled requests to.
+Profiling is disabled if ``None``. (see ``rest_auth.profiling``)
+"""
+
+REST_AUTH_PROFILE_SAMPLE_RATE = 0
+"""Default: ``0``
+
+Fraction (``0`` ~ ``1``) of requests to profile. Requests with a valid
+``X-Rest-Auth-Profile`` header are profiled regardless of this.
+"""
+
+REST_AUTH_PROFILE_HEADER_MAX_AGE = 300
+"""Default: ``300``
+
+Seconds a ``X-Rest-Auth-Profile`` header value is valid for.
+"""
+
+REST_AUTH_PROFILE_MAX_FILES = 100
+"""Default: ``100``
+
+Number of profiles kept in ``REST_AUTH_PROFILE_DIR``. Older ones are
+removed.
+"""
+
 REST_AUTH_SIGNUP_REQUIRE_EMAIL_CONFIRMATION = False
 """Default: ``False``
 
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Forms used by rest_auth's serializers.
+"""
+from __future__ import unicode_literals
+
+import unicodedata
+
+from django.contrib.auth import forms, get_user_model
+from django.db.models import CharField, Value
+from django.db.models.functions import Lower
+
+from . import mail
+
+UserModel = get_user_model()
+
+
+def casefold_email(email):
+    """Normalizes an email for case-insensitive comparison.
+    """
+    return unicodedata.normalize('NFKC', email).casefold()
+
+
+def _unicode_ci_compare(s1, s2):
+    """Same as ``django.contrib.auth.forms._unicode_ci_compare``.
+    (not in every django version)
+    """
+    return casefold_email(s1) == casefold_email(s2)
+
+
+class PasswordResetForm(forms.PasswordResetForm):
+    """django's ``PasswordResetForm``, but messages are delivered through
+    ``rest_auth.mail``. (so it respects ``REST_AUTH_EMAIL_OUTBOX``)
+
+    Users are looked up by ``LOWER(email)``, which is indexed by
+    rest_auth's migration.
+    """
+    def get_user_queryset(self, email):
+        """Active users of an email.
+
+        It queries ``LOWER(email)`` instead of ``email__iexact``, which is
+        ``LIKE`` or ``UPPER(email)`` on most databases and can't use indexes.
+        """
+        email_field_name = UserModel.get_email_field_name()
+        return UserModel._default_manager.annotate(
+            _rest_auth_email_lower=Lower(email_field_name),
+        ).filter(
+            _rest_auth_email_lower=Lower(Value(email, CharField())),
+            is_active=True,
+        )
+
+    def get_users(self, email):
+        """Given an email, return matching user(s) who should receive a reset.
+        """
+        email_field_name = UserModel.get_email_field_name()
+        active_users = self.get_user_queryset(email)
+        return (
+            user for user in active_users
+            if user.has_usable_password() and
+            _unicode_ci_compare(email, getattr(user, email_field_name))
+        )
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        mail.send_mail(
+            subject_template_name, email_template_name, context,
+            from_email, to_email,
+            html_email_template_name=html_email_template_name,
+        )
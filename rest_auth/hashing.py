@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""Bounded executor for password hashing.
+
+Password hashing is the most expensive work rest_auth does. (``check_password``
+in ``PasswordChangeSerializer`` & ``rest_auth.backends.ModelBackend``, and
+``set_password`` in ``SignupSerializer`` & ``SetPasswordSerializer``)
+
+Only the hasher goes through ``run``. Users are fetched and saved in the
+calling thread, in the request's transaction.
+
+By default (``REST_AUTH_HASHING_EXECUTOR = None``) ``run`` just calls the
+function. If ``'thread'`` or ``'process'`` is set,
+calls are run in a pool of ``REST_AUTH_HASHING_MAX_WORKERS`` workers,
+and at most ``REST_AUTH_HASHING_MAX_QUEUE`` calls wait for a worker.
+When the queue is full for ``REST_AUTH_HASHING_QUEUE_TIMEOUT`` seconds,
+``HashingUnavailable`` (503) is raised.
+
+.. NOTE::
+    ``LoginSerializer`` hashes through the executor only if
+    ``rest_auth.backends.ModelBackend`` is in ``AUTHENTICATION_BACKENDS``.
+    (django's ``ModelBackend`` hashes in the calling thread)
+
+.. NOTE::
+    ``'process'`` requires python 3.7+. Worker processes only hash,
+    and never touch the database.
+"""
+from __future__ import unicode_literals
+
+import os
+import threading
+import time
+from concurrent import futures
+
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import ugettext_lazy as _
+from rest_framework import exceptions, status
+
+from .conf import auth_settings
+
+
+class HashingUnavailable(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Server is busy. Please try again later.')
+    default_code = 'hashing_unavailable'
+
+
+def _init_process():
+    import django
+    from django.apps import apps
+    from django.db import connections
+
+    if not apps.ready:
+        django.setup()
+
+    # NOTE Never use (or close) connections inherited from parent process.
+    for connection in connections.all():
+        connection.connection = None
+
+
+def _timed_call(fn, args, kwargs):
+    return time.time(), fn(*args, **kwargs)
+
+
+class HashingExecutor(object):
+    """Runs hashing functions in a bounded pool & tracks queueing.
+    """
+    def __init__(self, kind, max_workers=None, max_queue=0,
+                 queue_timeout=None):
+        max_workers = max_workers or os.cpu_count() or 1
+        if kind == 'thread':
+            self._executor = futures.ThreadPoolExecutor(max_workers)
+        elif kind == 'process':
+            self._executor = futures.ProcessPoolExecutor(
+                max_workers, initializer=_init_process,
+            )
+        else:
+            raise ValueError('Unknown hashing executor: %r' % kind)
+
+        self.kind = kind
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self.depth = 0
+        self.max_depth = 0
+        self.calls = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def run(self, fn, *args, **kwargs):
+        submitted_at = time.time()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingUnavailable()
+
+        try:
+            with self._lock:
+                self.depth += 1
+                self.max_depth = max(self.max_depth, self.depth)
+
+            future = self._executor.submit(_timed_call, fn, args, kwargs)
+            started_at, result = future.result()
+        finally:
+            with self._lock:
+                self.depth -= 1
+            self._slots.release()
+
+        wait_time = max(started_at - submitted_at, 0.0)
+        with self._lock:
+            self.calls += 1
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+        return result
+
+    def stats(self):
+        """:return: a dict of queue depth & wait time (in seconds)
+        """
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'calls': self.calls,
+                'wait_time': self.wait_time,
+                'max_wait_time': self.max_wait_time,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """:return: ``HashingExecutor`` or ``None`` (hash inline)
+    """
+    global _executor
+
+    kind = auth_settings.HASHING_EXECUTOR
+    if kind is None:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = HashingExecutor(
+                kind,
+                max_workers=auth_settings.HASHING_MAX_WORKERS,
+                max_queue=auth_settings.HASHING_MAX_QUEUE,
+                queue_timeout=auth_settings.HASHING_QUEUE_TIMEOUT,
+            )
+        return _executor
+
+
+def reset_executor():
+    global _executor
+
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown()
+
+
+@receiver(setting_changed)
+def reset_executor_on_setting_changed(setting, **kwargs):
+    if setting.startswith('REST_AUTH_HASHING_'):
+        reset_executor()
+
+
+def run(fn, *args, **kwargs):
+    """Calls a hashing function through the executor.
+    """
+    executor = get_executor()
+    if executor is None:
+        return fn(*args, **kwargs)
+    return executor.run(fn, *args, **kwargs)
+
+
+def set_password(user, raw_password):
+    """Same as ``user.set_password``, but hashes through the executor.
+    """
+    user.password = run(hashers.make_password, raw_password)
+    # NOTE `AbstractBaseUser.save` notifies password validators with this.
+    user._password = raw_password
+
+
+def must_update(encoded):
+    """:return: ``True`` if ``encoded`` is not hashed by the preferred hasher
+        (or with its current parameters)
+    """
+    preferred = hashers.get_hasher('default')
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != preferred.algorithm or \
+        preferred.must_update(encoded)
+
+
+def check_password(user, raw_password):
+    """Same as ``user.check_password``, but hashes through the executor.
+
+    If the hash has to be upgraded, the user is saved in the calling thread.
+    """
+    encoded = user.password
+    if not run(hashers.check_password, raw_password, encoded):
+        return False
+
+    if must_update(encoded):
+        set_password(user, raw_password)
+        # NOTE same as `AbstractBaseUser.check_password`, it's not a change.
+        user._password = None
+        user.save(update_fields=['password'])
+    return True
+
+
+def stats():
+    executor = get_executor()
+    if executor is None:
+        return {}
+    return executor.stats()
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""Email rendering & delivery for verification and password-reset mails.
+
+Both email paths (``SignupSerializer.send_mail`` and password-reset form)
+render their messages here, and hand them to ``deliver``.
+
+Templates are compiled once per process and kept in ``templates``
+(a ``TemplateCache``), keyed by template name and active language.
+
+If ``REST_AUTH_EMAIL_OUTBOX`` is set, messages are stored in the outbox
+table instead of being sent inside a request, and
+``manage.py rest_auth_outbox`` delivers them later.
+"""
+from __future__ import unicode_literals
+
+import datetime
+import threading
+
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.template import loader
+from django.utils import timezone, translation
+
+from .conf import auth_settings
+from .models import OutboxMessage
+
+
+class TemplateCache(object):
+    """Compiled email templates, keyed by template name and language.
+
+    ``hits`` and ``misses`` count lookups. (see ``info``)
+    """
+    def __init__(self):
+        self._templates = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_template(self, template_name):
+        if not auth_settings.EMAIL_TEMPLATE_CACHE:
+            return loader.get_template(template_name)
+
+        key = (template_name, translation.get_language())
+        template = self._templates.get(key)
+        if template is not None:
+            with self._lock:
+                self.hits += 1
+            return template
+
+        template = loader.get_template(template_name)
+        with self._lock:
+            self.misses += 1
+            self._templates[key] = template
+        return template
+
+    def render_to_string(self, template_name, context=None):
+        return self.get_template(template_name).render(context)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """:return: a dict of ``hits``, ``misses`` and ``size``
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._templates),
+            }
+
+
+templates = TemplateCache()
+
+
+@receiver(setting_changed)
+def clear_templates(setting, **kwargs):
+    if setting in ('TEMPLATES', 'REST_AUTH_EMAIL_TEMPLATE_CACHE'):
+        templates.clear()
+
+
+def render_mail(subject_template_name, email_template_name, context,
+                from_email, to_email, html_email_template_name=None):
+    """Renders templates and builds a ``EmailMultiAlternatives``.
+
+    Same as django's ``PasswordResetForm.send_mail``, except that templates
+    are cached and the message is returned, not sent.
+    """
+    subject = templates.render_to_string(subject_template_name, context)
+    # Email subject *must not* contain newlines
+    subject = ''.join(subject.splitlines())
+    body = templates.render_to_string(email_template_name, context)
+
+    email_message = EmailMultiAlternatives(
+        subject, body, from_email, [to_email]
+    )
+    if html_email_template_name is not None:
+        html_email = templates.render_to_string(
+            html_email_template_name, context
+        )
+        email_message.attach_alternative(html_email, 'text/html')
+
+    return email_message
+
+
+def send_mail(subject_template_name, email_template_name, context,
+              from_email, to_email, html_email_template_name=None):
+    """Renders a message and delivers it. (see ``deliver``)
+    """
+    email_message = render_mail(
+        subject_template_name, email_template_name, context,
+        from_email, to_email,
+        html_email_template_name=html_email_template_name,
+    )
+    deliver(email_message)
+
+
+def deliver(email_message):
+    """Sends a message, or queues it to the outbox
+    if ``REST_AUTH_EMAIL_OUTBOX`` is set.
+    """
+    if auth_settings.EMAIL_OUTBOX:
+        OutboxMessage.objects.enqueue(email_message)
+    else:
+        email_message.send()
+
+
+def get_retry_delay(attempts):
+    """Exponential backoff for failed outbox messages.
+
+    :param attempts: number of failed attempts (>= 1)
+    """
+    delay = auth_settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1)
+    return datetime.timedelta(seconds=delay)
+
+
+def _retry_later(outbox_message, error, max_attempts):
+    outbox_message.attempts += 1
+    outbox_message.last_error = repr(error)
+    if outbox_message.attempts >= max_attempts:
+        outbox_message.next_attempt_at = None
+    else:
+        outbox_message.next_attempt_at = (
+            timezone.now() + get_retry_delay(outbox_message.attempts)
+        )
+    outbox_message.save(update_fields=[
+        'attempts', 'last_error', 'next_attempt_at',
+    ])
+
+
+def drain_outbox(batch_size=None, connection=None):
+    """Delivers one batch of due outbox messages over a single connection.
+
+    Delivered messages are deleted. Failed messages are retried later with
+    exponential backoff, and abandoned after
+    ``REST_AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS`` attempts. If the connection
+    can't be opened, the whole batch fails.
+
+    :return: a tuple of (number of sent messages, number of failures)
+    """
+    if batch_size is None:
+        batch_size = auth_settings.EMAIL_OUTBOX_BATCH_SIZE
+
+    max_attempts = auth_settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+
+    with transaction.atomic():
+        # NOTE rows are locked while sending, so several workers can drain
+        # the outbox concurrently. (ignored on databases w/o row locks)
+        queryset = OutboxMessage.objects.due(timezone.now())
+        outbox_messages = list(
+            queryset.select_for_update(skip_locked=True)[:batch_size]
+        )
+        if not outbox_messages:
+            return 0, 0
+
+        connection = connection or get_connection()
+        try:
+            connection.open()
+        except Exception as e:
+            # e.g. the SMTP server is down.
+            for outbox_message in outbox_messages:
+                _retry_later(outbox_message, e, max_attempts)
+            return 0, len(outbox_messages)
+
+        sent, failures = [], 0
+        try:
+            for outbox_message in outbox_messages:
+                try:
+                    connection.send_messages([outbox_message.to_message()])
+                except Exception as e:
+                    failures += 1
+                    _retry_later(outbox_message, e, max_attempts)
+                else:
+                    sent.append(outbox_message.pk)
+        finally:
+            connection.close()
+
+        OutboxMessage.objects.filter(pk__in=sent).delete()
+
+    return len(sent), failures
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from rest_auth import bench
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks rest_auth\'s endpoints in a test database. '
+        'Use --keepdb (and a TEST NAME for SQLite) to keep generated users.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users', type=int, default=1000,
+            help='Number of users in the database. '
+                 'Missing ones are generated.',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=100,
+            help='Requests sent for each scenario.',
+        )
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=list(bench.SCENARIOS),
+            help='Scenario to run. (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--hasher', action='append', dest='hashers',
+            choices=list(bench.HASHERS),
+            help='Password hashers to run with. (repeatable, default: all)',
+        )
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Preserves the test database between runs.',
+        )
+        parser.add_argument(
+            '--memory', action='store_true',
+            help='Measures memory of requests instead of latency.',
+        )
+        parser.add_argument(
+            '--baseline', default=None,
+            help='Writes results of --memory to this JSON file.',
+        )
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+
+        setup_test_environment()
+        old_config = setup_databases(
+            verbosity, interactive=False, keepdb=options['keepdb'],
+        )
+        try:
+            self.populate(options['users'])
+            if options['memory']:
+                results = bench.run_memory(
+                    scenarios=options['scenarios'],
+                    requests=options['requests'],
+                )
+            else:
+                results = bench.run(
+                    scenarios=options['scenarios'],
+                    hashers=options['hashers'],
+                    requests=options['requests'],
+                )
+        except ValueError as e:
+            raise CommandError(e)
+        finally:
+            teardown_databases(
+                old_config, verbosity, keepdb=options['keepdb'],
+            )
+            teardown_test_environment()
+
+        if options['memory']:
+            self.write_memory(results, options['baseline'])
+            return
+
+        self.stdout.write('%-10s %-16s %10s %10s %10s %8s %7s' % (
+            'hasher', 'scenario', 'req/s', 'p50 (ms)', 'p99 (ms)',
+            'queries', 'errors',
+        ))
+        for hasher, scenario, result in results:
+            self.stdout.write('%-10s %-16s %10.1f %10.2f %10.2f %8.1f %7d' % (
+                hasher, scenario, result['rps'],
+                result['p50'] * 1000, result['p99'] * 1000,
+                result['queries'], result['errors'],
+            ))
+
+    def write_memory(self, results, baseline):
+        self.stdout.write('%-16s %14s %20s' % (
+            'scenario', 'peak (bytes)', 'retained (bytes/req)',
+        ))
+        for name, result in results.items():
+            self.stdout.write('%-16s %14d %20d' % (
+                name, result['peak'], result['retained'],
+            ))
+
+        if baseline:
+            bench.save_baseline(baseline, results)
+            self.stdout.write('Baseline written to %s' % baseline)
+
+    def populate(self, count):
+        existing = bench.get_bench_users().count()
+        if existing >= count:
+            return
+
+        created = bench.create_users(count - existing, start=existing)
+        self.stdout.write('%d users created' % created)
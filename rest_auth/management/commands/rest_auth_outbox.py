@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management.base import BaseCommand
+from rest_auth.mail import drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        'Delivers emails queued by rest_auth. '
+        '(used with REST_AUTH_EMAIL_OUTBOX = True)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Emails sent per batch. '
+                 '(default: REST_AUTH_EMAIL_OUTBOX_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and poll the outbox.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Seconds to sleep when the outbox is empty. (with --loop)',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failures = drain_outbox(batch_size=options['batch_size'])
+            if sent or failures:
+                self.stdout.write(
+                    '%d sent, %d failed' % (sent, failures)
+                )
+                continue
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_auth import profiling
+from rest_auth.conf import auth_settings
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarizes profiles of rest_auth\'s endpoints, '
+        'written to REST_AUTH_PROFILE_DIR.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', dest='directory', default=None,
+            help='Directory of profiles. (default: REST_AUTH_PROFILE_DIR)',
+        )
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Frames shown for each endpoint.',
+        )
+        parser.add_argument(
+            '--sort', choices=('cumulative', 'tottime'),
+            default='cumulative', help='Sort key of frames.',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['directory'] or auth_settings.PROFILE_DIR
+        if not directory or not os.path.isdir(directory):
+            raise CommandError('No profile directory: %r' % directory)
+
+        summary = profiling.summarize(
+            directory, top=options['top'], sort=options['sort'],
+        )
+        if not summary:
+            self.stdout.write('No profiles in %s' % directory)
+            return
+
+        for endpoint in sorted(summary):
+            requests, frames = summary[endpoint]
+            self.stdout.write('%s (%d requests)' % (endpoint, requests))
+            self.stdout.write('%10s %12s %12s  %s' % (
+                'calls', 'tottime (ms)', 'cumtime (ms)', 'function',
+            ))
+            for function, calls, tottime, cumtime in frames:
+                self.stdout.write('%10d %12.2f %12.2f  %s' % (
+                    calls, tottime * 1000, cumtime * 1000, function,
+                ))
+            self.stdout.write('')
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""In-process metrics of rest_auth.
+
+rest_auth's views count requests per endpoint & outcome, and observe
+latency in fixed-bucket histograms. Outcome is ``success``, or error code
+of the response. (e.g. ``invalid_login`` of ``LoginSerializer``,
+``password_mismatch`` of ``SignupSerializer``, ``throttled``...)
+
+Metrics are kept in ``registry`` of each process, and can be exposed in
+prometheus' text format by ``metrics_view``. (``REST_AUTH_METRICS_VIEW``)
+
+.. code-block:: python
+
+    from rest_auth.metrics import registry
+
+    failed_logins = registry.counter(
+        'myapp_failed_logins_total', 'Failed logins.', ('reason', ),
+    )
+    failed_logins.inc(('locked', ))
+"""
+from __future__ import unicode_literals
+
+import bisect
+import functools
+import threading
+from time import perf_counter
+
+from django.http import HttpResponse
+from rest_framework import exceptions
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+"""Upper bounds (seconds) of latency buckets. (``+Inf`` is added)
+"""
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+VIEW_ATTR = '_rest_auth_metrics_view'
+
+
+def _format_labels(labelnames, labels, extra=()):
+    pairs = list(zip(labelnames, labels)) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (
+            name,
+            ('%s' % value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'),
+        )
+        for name, value in pairs
+    )
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric(object):
+    """Base class of metrics. Values are kept per ``labels``, a tuple of
+    label values in the order of ``labelnames``.
+    """
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def expose(self):
+        """:return: lines of text format.
+        """
+        lines = [
+            '# HELP %s %s' % (self.name, self.documentation),
+            '# TYPE %s %s' % (self.name, self.type),
+        ]
+        with self._lock:
+            values = sorted(self._values.items())
+            lines.extend(self._expose(values))
+        return lines
+
+
+class Counter(Metric):
+    """Monotonically increasing values.
+    """
+    type = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def _expose(self, values):
+        for labels, value in values:
+            yield '%s%s %s' % (
+                self.name, _format_labels(self.labelnames, labels),
+                _format_value(value),
+            )
+
+
+class Histogram(Metric):
+    """Counts observations in fixed buckets, with their sum & count.
+    """
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super(Histogram, self).__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        # NOTE the last bucket is +Inf.
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                # [bucket counts..., +Inf count, sum]
+                counts = self._values[labels] = \
+                    [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    def get(self, labels=()):
+        """:return: a dict of ``buckets`` (cumulative), ``count`` and ``sum``.
+        """
+        with self._lock:
+            counts = list(self._values.get(labels) or
+                          [0] * (len(self.buckets) + 1) + [0.0])
+
+        cumulative = []
+        total = 0
+        for count in counts[:-1]:
+            total += count
+            cumulative.append(total)
+        return {
+            'buckets': list(zip(self.buckets + (float('inf'), ), cumulative)),
+            'count': total,
+            'sum': counts[-1],
+        }
+
+    def _expose(self, values):
+        for labels, counts in values:
+            total = 0
+            bounds = self.buckets + (float('inf'), )
+            for bound, count in zip(bounds, counts[:-1]):
+                total += count
+                yield '%s_bucket%s %s' % (
+                    self.name,
+                    _format_labels(
+                        self.labelnames, labels,
+                        [('le', _format_value(bound))],
+                    ),
+                    _format_value(total),
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            yield '%s_sum%s %s' % (
+                self.name, label_text, _format_value(counts[-1]),
+            )
+            yield '%s_count%s %s' % (
+                self.name, label_text, _format_value(total),
+            )
+
+
+class Registry(object):
+    """A collection of metrics.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(
+                    'Metric %s is already registered.' % metric.name
+                )
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(),
+                  buckets=DEFAULT_BUCKETS):
+        return self.register(
+            Histogram(name, documentation, labelnames, buckets),
+        )
+
+    def clear(self):
+        """Resets values of all metrics. (for tests)
+        """
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def expose(self):
+        """:return: all metrics in prometheus' text format.
+        """
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].expose())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    'rest_auth_requests_total',
+    'Requests to rest_auth endpoints, by outcome.',
+    ('endpoint', 'outcome'),
+)
+
+request_duration = registry.histogram(
+    'rest_auth_request_duration_seconds',
+    'Latency of rest_auth endpoints.',
+    ('endpoint', ),
+)
+
+
+def get_outcome(exc=None, response=None):
+    """:return: ``success``, or error code of ``exc`` or ``response``.
+    """
+    if exc is not None:
+        if isinstance(exc, exceptions.APIException):
+            codes = exc.get_codes()
+            # first code of (nested) ValidationError.
+            while isinstance(codes, (dict, list)):
+                if not codes:
+                    break
+                codes = next(iter(codes.values())) \
+                    if isinstance(codes, dict) else codes[0]
+            if isinstance(codes, str):
+                return codes
+        return 'error'
+
+    if response is not None and response.status_code >= 400:
+        return 'error'
+    return 'success'
+
+
+class MetricsMixin(object):
+    """Counts requests & observes latency of a view. (rest_framework's
+    views or django's views)
+
+    ``metrics_endpoint`` is url name of the view by default.
+    """
+    metrics_endpoint = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # NOTE wraps the view function, not ``dispatch``, because views
+        # override ``dispatch``. (e.g. ``EmailVerificationConfirmView``)
+        view = super(MetricsMixin, cls).as_view(**initkwargs)
+
+        def metered_view(request, *args, **kwargs):
+            start = perf_counter()
+            try:
+                response = view(request, *args, **kwargs)
+            except Exception as exc:
+                cls._observe(request, exc, None, perf_counter() - start)
+                raise
+            cls._observe(request, None, response, perf_counter() - start)
+            return response
+
+        return functools.update_wrapper(metered_view, view)
+
+    @staticmethod
+    def _observe(request, exc, response, duration):
+        self = getattr(request, VIEW_ATTR, None)
+        if self is not None:
+            self.observe_request(request, exc, response, duration)
+
+    def setup(self, request, *args, **kwargs):
+        super(MetricsMixin, self).setup(request, *args, **kwargs)
+        self.metrics_exception = None
+        setattr(request, VIEW_ATTR, self)
+
+    def handle_exception(self, exc):
+        # rest_framework's views handle exceptions in ``dispatch``.
+        self.metrics_exception = exc
+        return super(MetricsMixin, self).handle_exception(exc)
+
+    def get_metrics_endpoint(self, request):
+        if self.metrics_endpoint:
+            return self.metrics_endpoint
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name:
+            return match.url_name
+        return self.__class__.__name__
+
+    def get_metrics_outcome(self, exc, response):
+        # django's confirm views render invalid links with 200.
+        if getattr(self, 'validlink', None) is False:
+            return 'invalid_link'
+        return get_outcome(exc or self.metrics_exception, response)
+
+    def observe_request(self, request, exc, response, duration):
+        endpoint = self.get_metrics_endpoint(request)
+        requests_total.inc(
+            (endpoint, self.get_metrics_outcome(exc, response)),
+        )
+        request_duration.observe(duration, (endpoint, ))
+
+
+def metrics_view(request):
+    """Exposes ``registry`` in prometheus' text format.
+
+    .. WARNING::
+        Metrics are not protected by this view. Restrict access to it
+        (e.g. in your proxy) if needed.
+    """
+    return HttpResponse(registry.expose(), content_type=CONTENT_TYPE)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Middlewares of rest_auth.
+"""
+from __future__ import unicode_literals
+
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .budgets import (
+    QueryBudgetExceeded,
+    check_query_budget,
+    get_query_budget,
+)
+from .conf import auth_settings
+from .timing import TIMINGS_ATTR, format_server_timing, record
+
+logger = logging.getLogger('rest_auth.budgets')
+
+
+class QueryBudgetMiddleware(object):
+    """Checks ``query_budget`` of views in development. (``DEBUG = True``)
+
+    Requests over the budget are logged to ``rest_auth.budgets`` logger,
+    or raise ``QueryBudgetExceeded`` if ``REST_AUTH_QUERY_BUDGET_RAISE`` is
+    ``True``.
+
+    Put this at the end of ``MIDDLEWARE``, so only queries of views are
+    counted.
+    """
+    def __init__(self, get_response):
+        if not settings.DEBUG:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = []
+
+        def count(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        wrappers = [
+            connection.execute_wrapper(count)
+            for connection in connections.all()
+        ]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            request._rest_auth_queries = queries
+            response = self.get_response(request)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        view_func = getattr(request, '_rest_auth_view', None)
+        if view_func is not None:
+            self.check(view_func, queries[request._rest_auth_offset:])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if get_query_budget(view_func) is not None:
+            request._rest_auth_view = view_func
+            request._rest_auth_offset = len(request._rest_auth_queries)
+
+    def check(self, view_func, queries):
+        try:
+            check_query_budget(view_func, queries)
+        except QueryBudgetExceeded as e:
+            if auth_settings.QUERY_BUDGET_RAISE:
+                raise
+            logger.warning('%s', e)
+
+
+class ServerTimingMiddleware(object):
+    """Sends durations of stages (see ``rest_auth.timing``) in
+    ``Server-Timing`` header, with ``render`` (of template responses) and
+    ``total``.
+
+    Put this at the beginning of ``MIDDLEWARE``, so ``total`` includes
+    other middlewares.
+
+    .. WARNING::
+        Timings tell clients how requests are processed (e.g. how long
+        ``authenticate`` took). Use this where it's acceptable.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        setattr(request, TIMINGS_ATTR, [])
+        response = self.get_response(request)
+        record(request, 'total', perf_counter() - start)
+
+        response['Server-Timing'] = format_server_timing(
+            getattr(request, TIMINGS_ATTR),
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        start = perf_counter()
+
+        def finish(response):
+            record(request, 'render', perf_counter() - start)
+
+        response.add_post_render_callback(finish)
+        return response
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.AutoField(
+                    auto_created=True, primary_key=True, serialize=False,
+                    verbose_name='ID')),
+                ('from_email', models.CharField(
+                    max_length=254, verbose_name='From')),
+                ('to', models.TextField(verbose_name='To')),
+                ('subject', models.TextField(verbose_name='Subject')),
+                ('body', models.TextField(verbose_name='Body')),
+                ('html_body', models.TextField(
+                    blank=True, verbose_name='HTML body')),
+                ('attempts', models.PositiveSmallIntegerField(
+                    default=0, verbose_name='Attempts')),
+                ('last_error', models.TextField(
+                    blank=True, verbose_name='Last error')),
+                ('next_attempt_at', models.DateTimeField(
+                    db_index=True, default=django.utils.timezone.now,
+                    null=True, verbose_name='Next attempt at')),
+                ('created_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Created at')),
+            ],
+            options={
+                'verbose_name': 'outbox message',
+                'verbose_name_plural': 'outbox messages',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('rest_auth', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthToken',
+            fields=[
+                ('digest', models.CharField(
+                    max_length=64, primary_key=True, serialize=False,
+                    verbose_name='Digest')),
+                ('created_at', models.DateTimeField(
+                    auto_now_add=True, verbose_name='Created at')),
+                ('user', models.ForeignKey(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    related_name='rest_auth_tokens',
+                    to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'auth token',
+                'verbose_name_plural': 'auth tokens',
+            },
+        ),
+    ]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Index on ``LOWER(email)`` of ``AUTH_USER_MODEL``.
+
+``PasswordResetForm.get_users`` looks users up by ``LOWER(email)``.
+(``email__iexact`` can't use indexes) Databases without functional
+indexes (e.g. MariaDB, MySQL < 8.0.13) are skipped.
+
+It depends on the latest migration of ``django.contrib.auth``, because
+migrations altering the user table rebuild it on SQLite, without this
+index. On PostgreSQL, the index is built ``CONCURRENTLY`` (outside a
+transaction), so writes to the user table aren't blocked.
+"""
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import migrations
+
+INDEX_NAME = 'rest_auth_email_lower_idx'
+
+CREATE_INDEX = {
+    'postgresql': (
+        'CREATE INDEX CONCURRENTLY IF NOT EXISTS %(name)s '
+        'ON %(table)s (LOWER(%(column)s))'
+    ),
+    'sqlite': 'CREATE INDEX %(name)s ON %(table)s (LOWER(%(column)s))',
+    'oracle': 'CREATE INDEX %(name)s ON %(table)s (LOWER(%(column)s))',
+    # MySQL 8.0.13+ (see ``_supports_index``)
+    'mysql': 'CREATE INDEX %(name)s ON %(table)s ((LOWER(%(column)s)))',
+}
+
+DROP_INDEX = {
+    'postgresql': 'DROP INDEX CONCURRENTLY IF EXISTS %(name)s',
+    'sqlite': 'DROP INDEX IF EXISTS %(name)s',
+    'oracle': 'DROP INDEX %(name)s',
+    'mysql': 'DROP INDEX %(name)s ON %(table)s',
+}
+
+
+def _supports_index(connection):
+    if connection.vendor != 'mysql':
+        return True
+    # NOTE functional indexes are MySQL 8.0.13+, not in MariaDB.
+    return not connection.mysql_is_mariadb and \
+        connection.mysql_version >= (8, 0, 13)
+
+
+def _execute(statements, apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor not in statements or \
+            not _supports_index(schema_editor.connection):
+        return
+
+    model = apps.get_model(settings.AUTH_USER_MODEL)
+    field = model._meta.get_field(get_user_model().get_email_field_name())
+    schema_editor.execute(statements[vendor] % {
+        'name': schema_editor.quote_name(INDEX_NAME),
+        'table': schema_editor.quote_name(model._meta.db_table),
+        'column': schema_editor.quote_name(field.column),
+    })
+
+
+def create_index(apps, schema_editor):
+    _execute(CREATE_INDEX, apps, schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    _execute(DROP_INDEX, apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+    # NOTE `CREATE INDEX CONCURRENTLY` can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0011_update_proxy_permissions'),
+        ('rest_auth', '0002_authtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
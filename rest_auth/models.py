@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""Models for rest_auth.
+"""
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+
+class OutboxMessageManager(models.Manager):
+    def enqueue(self, email_message):
+        """Stores a ``EmailMultiAlternatives`` for later delivery.
+
+        Only subject, bodies, sender and recipients are kept.
+        (This is all rest_auth's emails have.)
+        """
+        html_body = ''
+        for content, mimetype in getattr(email_message, 'alternatives', []):
+            if mimetype == 'text/html':
+                html_body = content
+                break
+
+        return self.create(
+            from_email=email_message.from_email,
+            to='\n'.join(email_message.to),
+            subject=email_message.subject,
+            body=email_message.body,
+            html_body=html_body,
+        )
+
+    def due(self, now):
+        """Messages which should be (re-)tried now.
+        """
+        return self.filter(next_attempt_at__lte=now).order_by(
+            'next_attempt_at', 'pk',
+        )
+
+
+class OutboxMessage(models.Model):
+    """An email waiting for delivery by ``manage.py rest_auth_outbox``.
+
+    ``next_attempt_at`` is ``NULL`` when delivery was abandoned.
+    """
+    from_email = models.CharField(_('From'), max_length=254)
+    to = models.TextField(_('To'))
+    subject = models.TextField(_('Subject'))
+    body = models.TextField(_('Body'))
+    html_body = models.TextField(_('HTML body'), blank=True)
+
+    attempts = models.PositiveSmallIntegerField(_('Attempts'), default=0)
+    last_error = models.TextField(_('Last error'), blank=True)
+    next_attempt_at = models.DateTimeField(
+        _('Next attempt at'), null=True, default=timezone.now, db_index=True,
+    )
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+
+    objects = OutboxMessageManager()
+
+    class Meta:
+        verbose_name = _('outbox message')
+        verbose_name_plural = _('outbox messages')
+
+    def to_message(self):
+        """Rebuilds ``EmailMultiAlternatives`` from this row.
+        """
+        email_message = EmailMultiAlternatives(
+            self.subject, self.body, self.from_email, self.to.splitlines(),
+        )
+        if self.html_body:
+            email_message.attach_alternative(self.html_body, 'text/html')
+        return email_message
+
+
+class AuthToken(models.Model):
+    """Opaque token issued on login. (``REST_AUTH_LOGIN_MODE = 'token'``)
+
+    Only SHA-256 digest of a token is stored.
+    """
+    digest = models.CharField(_('Digest'), max_length=64, primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='rest_auth_tokens', verbose_name=_('User'),
+    )
+    created_at = models.DateTimeField(_('Created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('auth token')
+        verbose_name_plural = _('auth tokens')
+
+
+class UserSessionManager(models.Manager):
+    def clear_expired(self):
+        """Removes entries of expired sessions.
+        (run this periodically, like ``manage.py clearsessions``)
+        """
+        return self.filter(expire_date__lt=timezone.now()).delete()
+
+
+class UserSession(models.Model):
+    """Index of sessions a user logged in to.
+
+    Entries are added & removed on ``user_logged_in`` & ``user_logged_out``.
+    (see ``rest_auth.sessions``)
+    """
+    session_key = models.CharField(
+        _('Session key'), max_length=40, primary_key=True,
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='rest_auth_sessions', verbose_name=_('User'),
+    )
+    expire_date = models.DateTimeField(_('Expire date'), db_index=True)
+
+    objects = UserSessionManager()
+
+    class Meta:
+        verbose_name = _('user session')
+        verbose_name_plural = _('user sessions')
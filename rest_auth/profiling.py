@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Sampling profiler for rest_auth's views.
+
+Set ``REST_AUTH_PROFILE_DIR`` to profile requests to rest_auth's views
+with ``cProfile``:
+
+- ``REST_AUTH_PROFILE_SAMPLE_RATE`` of requests are profiled at random.
+- Requests with a valid ``X-Rest-Auth-Profile`` header are always
+  profiled. (header value is made by ``make_profile_header``, and expires
+  after ``REST_AUTH_PROFILE_HEADER_MAX_AGE`` seconds)
+
+Each profile is written to ``<endpoint>-<time>-<pid>-<n>.prof`` in the
+directory, and only the newest ``REST_AUTH_PROFILE_MAX_FILES`` files are
+kept. Summarize them with ``summarize`` or
+``python manage.py rest_auth_profile``.
+
+Errors writing a profile are logged to ``rest_auth.profiling`` logger, and
+the response is returned as usual.
+
+If ``REST_AUTH_PROFILE_DIR`` is ``None`` (default), no request is
+profiled. Views are still wrapped (so the setting can be changed without
+reloading urls), and each request costs one cached settings lookup.
+"""
+from __future__ import unicode_literals
+
+import cProfile
+import functools
+import itertools
+import logging
+import os
+import pstats
+import random
+import time
+
+from django.core import signing
+
+from .conf import auth_settings
+
+HEADER = 'HTTP_X_REST_AUTH_PROFILE'
+"""``X-Rest-Auth-Profile`` header in ``request.META``.
+"""
+
+SALT = 'rest_auth.profiling'
+
+SUFFIX = '.prof'
+
+logger = logging.getLogger(__name__)
+
+_counter = itertools.count()
+
+
+def make_profile_header():
+    """:return: a signed value of ``X-Rest-Auth-Profile`` header.
+    """
+    return signing.TimestampSigner(salt=SALT).sign('profile')
+
+
+def has_profile_header(request):
+    value = request.META.get(HEADER)
+    if not value:
+        return False
+    try:
+        signing.TimestampSigner(salt=SALT).unsign(
+            value, max_age=auth_settings.PROFILE_HEADER_MAX_AGE,
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def should_profile(request):
+    """:return: ``True`` if ``request`` is sampled or has a valid header.
+    """
+    if not auth_settings.PROFILE_DIR:
+        return False
+
+    rate = auth_settings.PROFILE_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return True
+    return has_profile_header(request)
+
+
+def get_endpoint(request, view_class):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.url_name:
+        return match.url_name
+    return view_class.__name__
+
+
+def write_profile(profile, endpoint, directory=None):
+    """Dumps pstats of ``profile``, and removes old files.
+
+    :return: path of the written file.
+    """
+    directory = directory or auth_settings.PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    filename = '%s-%d-%d-%d%s' % (
+        endpoint, int(time.time() * 1000), os.getpid(), next(_counter),
+        SUFFIX,
+    )
+    path = os.path.join(directory, filename)
+    profile.dump_stats(path)
+
+    rotate(directory, auth_settings.PROFILE_MAX_FILES)
+    return path
+
+
+def get_profiles(directory):
+    """:return: paths of profiles in ``directory``, oldest first.
+    """
+    paths = []
+    for filename in os.listdir(directory):
+        if filename.endswith(SUFFIX):
+            path = os.path.join(directory, filename)
+            try:
+                paths.append((os.path.getmtime(path), path))
+            except OSError:
+                # removed by another process.
+                continue
+    return [path for _, path in sorted(paths)]
+
+
+def rotate(directory, max_files):
+    """Removes the oldest profiles beyond ``max_files``.
+    """
+    paths = get_profiles(directory)
+    for path in paths[:max(len(paths) - max_files, 0)]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def summarize(directory=None, top=10, sort='cumulative'):
+    """Merges profiles per endpoint.
+
+    :return: a dict of endpoint to ``(requests, frames)``. ``frames`` is
+        the top ``top`` list of ``(function, calls, tottime, cumtime)``,
+        sorted by ``sort`` (``'cumulative'`` or ``'tottime'``)
+    """
+    directory = directory or auth_settings.PROFILE_DIR
+    merged = {}
+    for path in get_profiles(directory):
+        endpoint = os.path.basename(path).rsplit('-', 3)[0]
+        try:
+            if endpoint in merged:
+                merged[endpoint][1].add(path)
+            else:
+                merged[endpoint] = [0, pstats.Stats(path)]
+        except (OSError, EOFError, TypeError, ValueError):
+            # removed or half-written by another process.
+            continue
+        merged[endpoint][0] += 1
+
+    index = 3 if sort == 'cumulative' else 2
+    summary = {}
+    for endpoint, (requests, stats) in merged.items():
+        frames = [
+            (pstats.func_std_string(func), nc, tt, ct)
+            for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+        ]
+        frames.sort(key=lambda frame: frame[index], reverse=True)
+        summary[endpoint] = (requests, frames[:top])
+    return summary
+
+
+class ProfilingMixin(object):
+    """Profiles sampled requests to a view. (see ``should_profile``)
+
+    The view is always wrapped. ``should_profile`` returns early unless
+    ``REST_AUTH_PROFILE_DIR`` is set.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # NOTE wraps the view function, like ``MetricsMixin``.
+        view = super(ProfilingMixin, cls).as_view(**initkwargs)
+
+        def sampled_view(request, *args, **kwargs):
+            if not should_profile(request):
+                return view(request, *args, **kwargs)
+
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # another profiler is running.
+                return view(request, *args, **kwargs)
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                profile.disable()
+                try:
+                    write_profile(profile, get_endpoint(request, cls))
+                except OSError:
+                    # NOTE never fail the request. (e.g. disk full)
+                    logger.exception('Failed to write a profile.')
+
+        return functools.update_wrapper(sampled_view, view)
@@ -1,21 +1,41 @@
 # -*- coding: utf-8 -*-
 """Serializer implementations for authentication.
 """
-from django.conf import settings
+import hashlib
+
 from django.contrib import auth
-from django.contrib.auth import get_user_model, login, password_validation
-from django.contrib.auth.forms import PasswordResetForm
-from django.contrib.auth.tokens import default_token_generator
+from django.contrib.auth import (
+    get_user_model, login, password_validation, user_logged_in,
+)
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.mail import EmailMultiAlternatives
-from django.template import loader
+from django.core import signing
+from django.core.cache import cache
+from django.db import IntegrityError, router, transaction
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.utils.translation import ugettext_lazy as _
 from rest_framework import serializers
+from rest_framework.utils import model_meta
+from rest_framework.validators import UniqueValidator
+
+from . import authentication, hashing, mail, sessions
+from .conf import auth_settings
+from .forms import PasswordResetForm, casefold_email
+from .timing import stage
+from .tokens import default_token_generator
 
 UserModel = get_user_model()
 
+PASSWORD_RESET_COOLDOWN_KEY = 'rest_auth:password_reset:cooldown:%s'
+PASSWORD_RESET_SUPPRESSED_KEY = 'rest_auth:password_reset:suppressed'
+
+
+def get_suppressed_password_resets():
+    """:return: number of password-reset emails suppressed by
+    ``REST_AUTH_PASSWORD_RESET_COOLDOWN``
+    """
+    return cache.get(PASSWORD_RESET_SUPPRESSED_KEY, 0)
+
 
 class LoginSerializer(serializers.Serializer):
     """Serializer for loggin in.
@@ -56,7 +76,12 @@ class LoginSerializer(serializers.Serializer):
         username = data['username']
         password = data['password']
 
-        self.user = auth.authenticate(username=username, password=password)
+        # NOTE hashes through ``rest_auth.hashing`` with
+        # ``rest_auth.backends.ModelBackend``.
+        with stage(self.context.get('request'), 'authenticate'):
+            self.user = auth.authenticate(
+                username=username, password=password,
+            )
         if self.user is None:
             raise serializers.ValidationError(
                 self.error_messages['invalid_login'], code='invalid_login',
@@ -90,8 +115,22 @@ class LoginSerializer(serializers.Serializer):
     def perform_login(self, request, user):
         """Persist a user. Override this method if you do more than
         persisting user.
+
+        If ``REST_AUTH_LOGIN_MODE`` is ``'signed'`` or ``'token'``, tokens
+        are issued to ``self.tokens`` instead of logging in to a session.
         """
-        login(request, user)
+        mode = auth_settings.LOGIN_MODE
+        if mode == 'session':
+            login(request, user)
+            return
+
+        if mode == 'signed':
+            self.tokens = authentication.make_signed_tokens(user)
+        else:
+            self.tokens = {
+                'token': authentication.make_opaque_token(user),
+            }
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
 
     def get_user(self):
         """
@@ -100,6 +139,35 @@ class LoginSerializer(serializers.Serializer):
         return self.user
 
 
+class TokenRefreshSerializer(serializers.Serializer):
+    """Issues a new access token from a refresh token.
+    (see ``rest_auth.authentication``)
+
+    :param refresh: refresh token issued on login
+    """
+    refresh = serializers.CharField(label=_('Refresh token'))
+
+    default_error_messages = {
+        'invalid_token': _('Token is invalid or expired.'),
+    }
+
+    def validate_refresh(self, value):
+        """
+        :exception ValidationError: if token is invalid, expired or revoked
+        """
+        try:
+            self.user = authentication.load_refresh_token(value)
+        except signing.BadSignature:
+            raise serializers.ValidationError(
+                self.error_messages['invalid_token'], code='invalid_token',
+            )
+
+        return value
+
+    def to_representation(self, instance):
+        return {'access': authentication.make_access_token(self.user)}
+
+
 class PasswordResetSerializer(serializers.Serializer):
     """Sends a website link for resetting password.
     It uses django's ``PasswordResetForm`` directly because
@@ -119,7 +187,7 @@ class PasswordResetSerializer(serializers.Serializer):
         :exception VaildationError: ``rest_framework``'s field validation
         :exception VaildationError: ``django``'s field vaildation
         """
-        self.form = self.password_reset_form_class(data=self.initial_data)
+        self.form = self.password_reset_form_class(data={'email': value})
         if not self.form.is_valid():
             if 'email' in self.form.errors:
                 messages = self.form.errors['email']
@@ -139,15 +207,50 @@ class PasswordResetSerializer(serializers.Serializer):
              from_email=None, request=None, html_email_template_name=None,
              extra_email_context=None):
         """sends a email, which contains link for resetting password
+
+        Nothing is sent if an email was sent to the address in
+        ``REST_AUTH_PASSWORD_RESET_COOLDOWN`` seconds.
         """
-        return self.form.save(
-            domain_override=domain_override,
-            subject_template_name=subject_template_name,
-            email_template_name=email_template_name, use_https=use_https,
-            token_generator=token_generator, from_email=from_email,
-            request=request, html_email_template_name=html_email_template_name,
-            extra_email_context=extra_email_context,
-        )
+        cooldown_key = self.start_cooldown()
+        if cooldown_key is False:
+            return None
+
+        try:
+            return self.form.save(
+                domain_override=domain_override,
+                subject_template_name=subject_template_name,
+                email_template_name=email_template_name, use_https=use_https,
+                token_generator=token_generator, from_email=from_email,
+                request=request,
+                html_email_template_name=html_email_template_name,
+                extra_email_context=extra_email_context,
+            )
+        except Exception:
+            # NOTE let the user retry, if sending failed.
+            if cooldown_key is not None:
+                cache.delete(cooldown_key)
+            raise
+
+    def start_cooldown(self):
+        """Starts a cooldown for the requested email.
+
+        :return: cache key of the cooldown, ``None`` if cooldown is disabled,
+            or ``False`` if the email is already in cooldown.
+        """
+        timeout = auth_settings.PASSWORD_RESET_COOLDOWN
+        if not timeout:
+            return None
+
+        email = casefold_email(self.validated_data['email'])
+        key = PASSWORD_RESET_COOLDOWN_KEY % hashlib.md5(
+            force_bytes(email),
+        ).hexdigest()
+        if cache.add(key, 1, timeout):
+            return key
+
+        if not cache.add(PASSWORD_RESET_SUPPRESSED_KEY, 1, None):
+            cache.incr(PASSWORD_RESET_SUPPRESSED_KEY)
+        return False
 
 
 class SetPasswordSerializer(serializers.Serializer):
@@ -206,13 +309,43 @@ class SetPasswordSerializer(serializers.Serializer):
 
     def create(self, validated_data):
         """resets password
+
+        Only ``password`` column is updated. (see ``revoke_credentials``)
         """
         password = validated_data['new_password1']
-        self.user.set_password(password)
-        self.user.save()
+        old_session_hash = self.user.get_session_auth_hash()
+        hashing.set_password(self.user, password)
+        self.user.save(update_fields=['password'])
+        self.revoke_credentials(
+            self.context.get('request'), old_session_hash,
+        )
 
         return self.user
 
+    def revoke_credentials(self, request, old_session_hash):
+        """Keeps ``request`` logged in, and revokes other credentials of
+        the user in ``REST_AUTH_PASSWORD_CHANGE_REVOKE``.
+
+        The session of ``request`` is kept by refreshing its auth hash,
+        so the client doesn't need to log in again. So are other sessions
+        with ``old_session_hash`` (logged in with the previous password),
+        if ``'sessions'`` is not in ``REST_AUTH_PASSWORD_CHANGE_REVOKE``.
+        """
+        revoke = auth_settings.PASSWORD_CHANGE_REVOKE
+
+        if 'tokens' in revoke:
+            authentication.revoke_user_tokens(
+                self.user, keep=authentication.get_request_token(request),
+            )
+
+        session_key = sessions.update_session_auth_hash(request, self.user)
+        if 'sessions' in revoke:
+            sessions.revoke_user_sessions(self.user, keep=session_key)
+        else:
+            sessions.refresh_user_sessions(
+                self.user, old_session_hash, exclude=session_key,
+            )
+
 
 class PasswordChangeSerializer(SetPasswordSerializer):
     """resets password of user.
@@ -238,7 +371,7 @@ class PasswordChangeSerializer(SetPasswordSerializer):
         """
         :exception ValidationError: if old_password is not correct
         """
-        if not self.user.check_password(old_password):
+        if not hashing.check_password(self.user, old_password):
             raise serializers.ValidationError(
                 self.error_messages['password_incorrect'],
                 code='password_incorrect'
@@ -319,48 +452,110 @@ class SignupSerializer(serializers.ModelSerializer):
 
         return password2
 
+    def get_fields(self):
+        """Fields without ``UniqueValidator``.
+
+        Uniqueness is checked by database on insert, instead of a query
+        for each unique field. (see ``create``)
+        """
+        fields = super(SignupSerializer, self).get_fields()
+
+        self.unique_validators = {}
+        for name, field in fields.items():
+            validators = [
+                validator for validator in field.validators
+                if isinstance(validator, UniqueValidator)
+            ]
+            if validators:
+                field.validators = [
+                    validator for validator in field.validators
+                    if validator not in validators
+                ]
+                self.unique_validators[name] = validators
+
+        return fields
+
     def create(self, validated_data):
         """Creates user instance
 
-        CAVEAT:
+        A user is built with hashed password (and ``is_active``) in memory,
+        and inserted by a single query.
 
-        A clear difference between django's ``ModelForm`` and rest_framework's
-        ``ModelSerializer`` is that, model serializer's ``save`` method doesn't
-        respect form's ``commit=True``.
+        (``ModelSerializer.create`` inserts a user, and another query is
+        needed to save hashed password.)
 
-        Inside ``super().create``, a query is fired to create user,
-        and inside this, additional query is fired to save hashed password.
-        It's because ``ModelSerializer``'s ``create`` method uses
-        default manager's create function, ``Model._default_manager.create()``
-
-        (User model creation is recommended by calling ``UserManager``'s
-        ``create_user`` method)
+        Stages: ``hash_password``, ``insert`` and ``send_email``.
+        (see ``rest_auth.timing``)
 
         :param validated_data: validated data created after ``self.vaildate``
+        :exception ValidationError: when a unique field is already taken
         """
+        request = self.context.get('request')
         password = validated_data.pop('password1')
         email_opts = validated_data.pop('email_opts', {})
         validated_data.pop('password2')
 
-        # NOTE We should set user's password manually because
-        # ModelSerializer.create calls model._default_manager.save().
-        user = super(SignupSerializer, self).create(validated_data)
-        user.set_password(password)
+        # NOTE many-to-many fields are set after insert, like
+        # ``ModelSerializer.create``.
+        info = model_meta.get_field_info(UserModel)
+        many_to_many = {
+            name: validated_data.pop(name)
+            for name, relation in info.relations.items()
+            if relation.to_many and name in validated_data
+        }
+
+        user = UserModel(**validated_data)
+        with stage(request, 'hash_password'):
+            hashing.set_password(user, password)
 
         # user activation through email confirmation.
         require_email_confirmation =\
-            settings.REST_AUTH_SIGNUP_REQUIRE_EMAIL_CONFIRMATION
+            auth_settings.SIGNUP_REQUIRE_EMAIL_CONFIRMATION
 
-        update_fields = ['password']
         if require_email_confirmation:
-            user, new_update_fields = self.set_user_as_unverified(user)
-            update_fields.extend(new_update_fields)
-            self.send_mail(user, **email_opts)
+            user, _update_fields = self.set_user_as_unverified(user)
+
+        try:
+            with stage(request, 'insert'), \
+                    transaction.atomic(using=router.db_for_write(UserModel)):
+                user.save(force_insert=True)
+                for name, value in many_to_many.items():
+                    getattr(user, name).set(value)
+        except IntegrityError:
+            self.validate_unique(validated_data)
+            raise
 
-        user.save(update_fields=update_fields)
+        if require_email_confirmation:
+            with stage(request, 'send_email'):
+                self.send_mail(user, **email_opts)
 
         return user
 
+    def validate_unique(self, validated_data):
+        """Finds which unique field is taken, after insert failed.
+
+        :exception ValidationError: with ``UniqueValidator``'s message
+        """
+        errors = {}
+        for name, validators in self.unique_validators.items():
+            if name not in validated_data:
+                continue
+            field = self.fields[name]
+            for validator in validators:
+                try:
+                    if getattr(validator, 'requires_context', False):
+                        validator(validated_data[name], field)
+                    else:
+                        # rest_framework < 3.11
+                        validator.set_context(field)
+                        validator(validated_data[name])
+                except serializers.ValidationError as exc:
+                    errors[name] = exc.detail
+                    break
+
+        if errors:
+            raise serializers.ValidationError(errors)
+
     def set_user_as_unverified(self, user):
         user.is_active = False
         return user, ['is_active']
@@ -392,18 +587,8 @@ class SignupSerializer(serializers.ModelSerializer):
         if extra_email_context is not None:
             context.update(extra_email_context)
 
-        subject = loader.render_to_string(subject_template_name, context)
-        # Email subject *must not* contain newlines
-        subject = ''.join(subject.splitlines())
-        body = loader.render_to_string(email_template_name, context)
-
-        email_message = EmailMultiAlternatives(
-            subject, body, from_email, [email]
+        mail.send_mail(
+            subject_template_name, email_template_name, context,
+            from_email, email,
+            html_email_template_name=html_email_template_name,
         )
-        if html_email_template_name is not None:
-            html_email = loader.render_to_string(
-                html_email_template_name, context
-            )
-            email_message.attach_alternative(html_email, 'text/html')
-
-        email_message.send()
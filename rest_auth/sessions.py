@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""Index of sessions per user.
+
+django's session table has no user column. To log a user out of all
+sessions, every session has to be decoded. rest_auth keeps ``UserSession``
+(session key → user) instead:
+
+- an entry is added on ``user_logged_in``, (with a session)
+- and removed on ``user_logged_out``.
+
+``revoke_user_sessions`` deletes sessions of a user through the index,
+with queries proportional to the number of the user's sessions. It is used
+by ``LogoutAllView`` and when a password is changed or reset.
+
+``refresh_user_sessions`` keeps sessions of a user logged in after a
+password change instead, by refreshing their session auth hash.
+
+.. NOTE::
+    Sessions logged in before the index was installed are not
+    indexed. (they are logged out by django when a password is changed)
+    Entries of expired sessions are removed by
+    ``UserSession.objects.clear_expired()``.
+"""
+from __future__ import unicode_literals
+
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import (
+    HASH_SESSION_KEY, SESSION_KEY, user_logged_in, user_logged_out,
+)
+from django.dispatch import receiver
+from django.utils.crypto import constant_time_compare
+
+from .models import UserSession
+
+
+def get_session(request):
+    """:return: session of ``request``, if a user is logged in to it.
+    """
+    session = getattr(request, 'session', None)
+    if session is None or not session.session_key or \
+            SESSION_KEY not in session:
+        # NOTE not logged in to a session. (e.g. ``REST_AUTH_LOGIN_MODE``)
+        return None
+    return session
+
+
+@receiver(user_logged_in)
+def index_session(sender, request, user, **kwargs):
+    session = get_session(request)
+    if session is None:
+        return
+
+    UserSession.objects.bulk_create([UserSession(
+        session_key=session.session_key, user=user,
+        expire_date=session.get_expiry_date(),
+    )], ignore_conflicts=True)
+
+
+@receiver(user_logged_out)
+def unindex_session(sender, request, user, **kwargs):
+    session = get_session(request)
+    if session is None:
+        return
+
+    UserSession.objects.filter(session_key=session.session_key).delete()
+
+
+def update_session_auth_hash(request, user):
+    """Keeps the session of ``request`` logged in, after the password of
+    ``user`` is changed.
+
+    Unlike ``django.contrib.auth.update_session_auth_hash``, the session
+    key is not cycled. The hash is refreshed in place, and saved with the
+    response. (so neither the session nor its entry is rewritten)
+
+    :return: the session key, or ``None`` if not logged in to a session.
+    """
+    request = getattr(request, '_request', request)
+    session = get_session(request)
+    if session is None:
+        return None
+
+    if session[SESSION_KEY] == user._meta.pk.value_to_string(user):
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    return session.session_key
+
+
+def refresh_user_sessions(user, old_hash, exclude=None):
+    """Refreshes the session auth hash of sessions of ``user``, except
+    ``exclude`` (a session key), so they stay logged in after the password
+    is changed.
+
+    Only sessions logged in with the previous password (``old_hash``, the
+    session auth hash before the change) are refreshed. Others were already
+    logged out by django (e.g. by an earlier password change), and are
+    deleted instead.
+
+    .. NOTE::
+        Refreshed sessions are saved, so their expiry is renewed.
+
+    :return: number of refreshed sessions
+    """
+    entries = UserSession.objects.filter(user=user)
+    if exclude:
+        entries = entries.exclude(session_key=exclude)
+    entries = list(entries)
+    if not entries:
+        return 0
+
+    engine = import_module(settings.SESSION_ENGINE)
+    session_hash = user.get_session_auth_hash()
+    refreshed, stale = [], []
+    for entry in entries:
+        session = engine.SessionStore(entry.session_key)
+        if SESSION_KEY not in session or not constant_time_compare(
+                session.get(HASH_SESSION_KEY, ''), old_hash):
+            # expired, logged out, or of an older password.
+            session.delete(entry.session_key)
+            stale.append(entry.session_key)
+            continue
+        session[HASH_SESSION_KEY] = session_hash
+        entry.expire_date = session.get_expiry_date()
+        session.save()
+        refreshed.append(entry)
+
+    if stale:
+        UserSession.objects.filter(session_key__in=stale).delete()
+    UserSession.objects.bulk_update(refreshed, ['expire_date'])
+    return len(refreshed)
+
+
+def revoke_user_sessions(user, keep=None):
+    """Deletes all sessions of ``user``, except ``keep`` (a session key).
+
+    :return: number of deleted sessions
+    """
+    entries = UserSession.objects.filter(user=user)
+    if keep:
+        entries = entries.exclude(session_key=keep)
+
+    session_keys = list(entries.values_list('session_key', flat=True))
+    if not session_keys:
+        return 0
+
+    engine = import_module(settings.SESSION_ENGINE)
+    store = engine.SessionStore()
+    for session_key in session_keys:
+        store.delete(session_key)
+
+    UserSession.objects.filter(session_key__in=session_keys).delete()
+    return len(session_keys)
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""Test helpers.
+
+.. code-block:: python
+
+    from django.test import TestCase
+    from rest_auth.test import QueryBudgetTestMixin
+    from rest_auth.views import LoginView
+
+    class LoginTest(QueryBudgetTestMixin, TestCase):
+        def test_login(self):
+            with self.assertQueryBudget(LoginView):
+                self.client.post('/login/', data={...})
+"""
+from __future__ import unicode_literals
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from .budgets import check_query_budget, get_query_budget
+
+
+class _AssertQueryBudgetContext(CaptureQueriesContext):
+    def __init__(self, view, connection):
+        self.view = view
+        super(_AssertQueryBudgetContext, self).__init__(connection)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        super(_AssertQueryBudgetContext, self).__exit__(
+            exc_type, exc_value, traceback,
+        )
+        if exc_type is not None:
+            return
+        check_query_budget(self.view, [
+            query['sql'] for query in self.captured_queries
+        ])
+
+
+class QueryBudgetTestMixin(object):
+    """``TestCase`` mixin to check ``query_budget`` of views.
+    """
+    def assertQueryBudget(self, view, using=DEFAULT_DB_ALIAS):
+        """Asserts queries in the ``with`` block are in ``view``'s budget.
+
+        :exception QueryBudgetExceeded: (an ``AssertionError``)
+        """
+        if get_query_budget(view) is None:
+            self.fail('%s has no query_budget.' % view.__name__)
+        return _AssertQueryBudgetContext(view, connections[using])
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from mock import patch
+from rest_auth.authentication import (
+    OpaqueTokenAuthentication,
+    SignedTokenAuthentication,
+    load_opaque_token,
+    make_opaque_token,
+)
+from rest_auth.models import AuthToken
+from rest_framework import exceptions
+from rest_framework.test import APIRequestFactory
+
+UserModel = get_user_model()
+
+
+@override_settings(REST_AUTH_LOGIN_MODE='signed')
+class SignedTokenTest(TestCase):
+    def setUp(self):
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+    def login(self):
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION='Bearer %s' % token,
+        )
+        return SignedTokenAuthentication().authenticate(request)
+
+    def test_login_issues_tokens(self):
+        tokens = self.login()
+
+        self.assertEqual(sorted(tokens.keys()), ['access', 'refresh'])
+        # no session is created.
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    def test_authenticate_without_database(self):
+        tokens = self.login()
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate(tokens['access'])
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.get_username(), 'user')
+        self.assertTrue(user.is_authenticated)
+        self.assertEqual(user.user, self.user)
+
+    def test_no_token(self):
+        request = APIRequestFactory().get('/')
+        self.assertIsNone(SignedTokenAuthentication().authenticate(request))
+
+    def test_invalid_token(self):
+        tokens = self.login()
+
+        for token in ('invalid', tokens['refresh']):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authenticate(token)
+
+    def test_expired_token(self):
+        tokens = self.login()
+
+        expired = time.time() + settings.REST_AUTH_SIGNED_TOKEN_ACCESS_LIFETIME
+        with patch('time.time', return_value=expired + 1):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authenticate(tokens['access'])
+
+    def test_refresh(self):
+        tokens = self.login()
+
+        response = self.client.post(r('rest_auth:token_refresh'), data={
+            'refresh': tokens['refresh'],
+        })
+        self.assertEqual(response.status_code, 200)
+
+        user, _ = self.authenticate(response.json()['access'])
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_refresh_revoked_by_password_change(self):
+        tokens = self.login()
+
+        self.user.set_password('new-password')
+        self.user.save()
+
+        response = self.client.post(r('rest_auth:token_refresh'), data={
+            'refresh': tokens['refresh'],
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['refresh'][0],
+                         'Token is invalid or expired.')
+
+    def change_password(self, tokens):
+        with patch('rest_framework.views.APIView.authentication_classes',
+                   [SignedTokenAuthentication]):
+            return self.client.post(r('rest_auth:password_change'), data={
+                'old_password': 'pass',
+                'new_password1': 'new-password',
+                'new_password2': 'new-password',
+            }, HTTP_AUTHORIZATION='Bearer %s' % tokens['access'])
+
+    def test_password_change(self):
+        tokens = self.login()
+
+        response = self.change_password(tokens)
+        self.assertEqual(response.status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('new-password'))
+        response = self.client.post(r('rest_auth:token_refresh'), data={
+            'refresh': tokens['refresh'],
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_password_change_of_inactive_user(self):
+        tokens = self.login()
+        UserModel._default_manager.filter(pk=self.user.pk).update(
+            is_active=False,
+        )
+
+        response = self.change_password(tokens)
+        self.assertEqual(response.status_code, 401)
+
+        self.user.delete()
+        response = self.change_password(tokens)
+        self.assertEqual(response.status_code, 401)
+
+    def test_logout_all(self):
+        tokens = self.login()
+        device = Client()
+        device.force_login(self.user)
+        opaque_token = make_opaque_token(self.user)
+        self.assertTrue(self.user.rest_auth_sessions.exists())
+
+        with patch('rest_framework.views.APIView.authentication_classes',
+                   [SignedTokenAuthentication]):
+            response = self.client.post(
+                r('rest_auth:logout_all'),
+                HTTP_AUTHORIZATION='Bearer %s' % tokens['access'],
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertFalse(self.user.rest_auth_sessions.exists())
+        self.assertFalse(AuthToken.objects.filter(user=self.user).exists())
+        self.assertIsNone(load_opaque_token(opaque_token))
+
+
+@override_settings(REST_AUTH_LOGIN_MODE='token')
+class OpaqueTokenTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+    def login(self):
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()['token']
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION='Token %s' % token,
+        )
+        return OpaqueTokenAuthentication().authenticate(request)
+
+    def test_login_issues_token(self):
+        token = self.login()
+
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        # only digest is stored.
+        self.assertFalse(AuthToken.objects.filter(digest=token).exists())
+        self.assertEqual(self.user.rest_auth_tokens.count(), 1)
+
+    def test_lookup_is_cached(self):
+        token = self.login()
+
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(token)
+        self.assertEqual(user, self.user)
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(token)
+        self.assertEqual(user, self.user)
+
+    def test_invalid_token_is_cached(self):
+        with self.assertNumQueries(1):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authenticate('invalid')
+
+        with self.assertNumQueries(0):
+            with self.assertRaises(exceptions.AuthenticationFailed):
+                self.authenticate('invalid')
+
+    def test_cache_is_cleared_on_user_save(self):
+        token = self.login()
+        self.authenticate(token)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_cache_is_kept_on_partial_save(self):
+        token = self.login()
+        self.authenticate(token)
+
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['email'])
+        with self.assertNumQueries(0):
+            self.authenticate(token)
+
+    @override_settings(REST_AUTH_LOGIN_MODE='session')
+    def test_user_save_without_tokens(self):
+        with self.assertNumQueries(1):
+            self.user.save()
+
+    def test_cache_is_cleared_on_user_delete(self):
+        token = self.login()
+        self.authenticate(token)
+
+        self.user.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_cache_is_kept_on_login(self):
+        token = self.login()
+        self.authenticate(token)
+
+        self.login()
+        with self.assertNumQueries(0):
+            self.authenticate(token)
+
+    @override_settings(REST_AUTH_TOKEN_CACHE_TIMEOUT=0)
+    def test_cache_disabled(self):
+        token = self.login()
+
+        for _ in range(2):
+            with self.assertNumQueries(1):
+                self.authenticate(token)
+
+    def test_logout_revokes_token(self):
+        token = self.login()
+        self.authenticate(token)
+
+        with patch('rest_framework.views.APIView.authentication_classes',
+                   [OpaqueTokenAuthentication]):
+            response = self.client.post(
+                r('rest_auth:logout'), HTTP_AUTHORIZATION='Token %s' % token,
+            )
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_password_change_revokes_tokens(self):
+        token = self.login()
+        self.authenticate(token)
+
+        self.client.login(username='user', password='pass')
+        response = self.client.post(r('rest_auth:password_change'), data={
+            'old_password': 'pass',
+            'new_password1': 'new-password',
+            'new_password2': 'new-password',
+        })
+        self.assertEqual(response.status_code, 200)
+
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_password_change_keeps_request_token(self):
+        token, other = self.login(), self.login()
+
+        with patch('rest_framework.views.APIView.authentication_classes',
+                   [OpaqueTokenAuthentication]):
+            response = self.client.post(r('rest_auth:password_change'), data={
+                'old_password': 'pass',
+                'new_password1': 'new-password',
+                'new_password2': 'new-password',
+            }, HTTP_AUTHORIZATION='Token %s' % token)
+        self.assertEqual(response.status_code, 200)
+
+        user, _ = self.authenticate(token)
+        self.assertEqual(user, self.user)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(other)
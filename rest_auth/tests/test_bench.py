@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_auth import bench
+
+UserModel = get_user_model()
+
+
+class BenchTest(TestCase):
+    def test_create_users(self):
+        self.assertEqual(bench.create_users(25, batch_size=10), 25)
+        self.assertEqual(bench.create_users(5, start=25), 5)
+
+        self.assertEqual(bench.get_bench_users().count(), 30)
+        user = UserModel._default_manager.get(username='bench-29')
+        self.assertEqual(user.email, 'bench-29@example.com')
+        self.assertTrue(user.check_password(bench.PASSWORD))
+
+    def test_run(self):
+        bench.create_users(10)
+
+        results = bench.run(hashers=['fast'], requests=3, sample=5)
+
+        self.assertEqual(
+            [scenario for _, scenario, _ in results], list(bench.SCENARIOS),
+        )
+        for hasher, scenario, result in results:
+            self.assertEqual(result['requests'], 3)
+            self.assertEqual(result['errors'], 0, scenario)
+            self.assertGreater(result['rps'], 0)
+            self.assertGreaterEqual(result['p99'], result['p50'])
+
+        # users created by signup scenario aren't bench users.
+        self.assertEqual(bench.get_bench_users().count(), 10)
+
+    def test_no_users(self):
+        with self.assertRaises(ValueError):
+            bench.run()
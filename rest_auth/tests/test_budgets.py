@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import logging
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from mock import patch
+from rest_auth.budgets import QueryBudgetExceeded, is_counted
+from rest_auth.test import QueryBudgetTestMixin
+from rest_auth.tokens import default_token_generator
+from rest_auth.views import (
+    EmailVerificationConfirmView,
+    LoginView,
+    LogoutAllView,
+    LogoutView,
+    PasswordChangeView,
+    PasswordForgotConfirmView,
+    PasswordForgotView,
+    SignupView,
+    TokenRefreshView,
+)
+
+UserModel = get_user_model()
+
+MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'rest_auth.middleware.QueryBudgetMiddleware',
+]
+
+
+class QueryBudgetTest(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+        self.uidb64 = urlsafe_base64_encode(force_bytes(self.user.pk))
+
+    def test_login(self):
+        with self.assertQueryBudget(LoginView):
+            response = self.client.post(r('rest_auth:login'), data={
+                'username': 'user', 'password': 'pass',
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout(self):
+        self.client.force_login(self.user)
+        with self.assertQueryBudget(LogoutView):
+            response = self.client.post(r('rest_auth:logout'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_logout_all(self):
+        self.client.force_login(self.user)
+        with self.assertQueryBudget(LogoutAllView):
+            response = self.client.post(r('rest_auth:logout_all'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(REST_AUTH_LOGIN_MODE='signed')
+    def test_token_refresh(self):
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        with self.assertQueryBudget(TokenRefreshView):
+            response = self.client.post(r('rest_auth:token_refresh'), data={
+                'refresh': response.json()['refresh'],
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_forgot(self):
+        with self.assertQueryBudget(PasswordForgotView):
+            response = self.client.post(r('rest_auth:forgot'), data={
+                'email': 'user@localhost',
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_forgot_confirm(self):
+        with self.assertQueryBudget(PasswordForgotConfirmView):
+            response = self.client.get(r(
+                'rest_auth:password_reset_confirm', kwargs={
+                    'uidb64': self.uidb64,
+                    'token': default_token_generator.make_token(self.user),
+                },
+            ))
+        self.assertEqual(response.status_code, 302)
+
+    def test_password_change(self):
+        self.client.force_login(self.user)
+        with self.assertQueryBudget(PasswordChangeView):
+            response = self.client.post(r('rest_auth:password_change'), data={
+                'old_password': 'pass',
+                'new_password1': 'new-password',
+                'new_password2': 'new-password',
+            })
+        self.assertEqual(response.status_code, 200)
+
+    def test_signup(self):
+        with self.assertQueryBudget(SignupView):
+            response = self.client.post(r('rest_auth:signup'), data={
+                'username': 'new-user',
+                'email': 'new-user@localhost',
+                'password1': 'password1!',
+                'password2': 'password1!',
+            })
+        self.assertEqual(response.status_code, 201)
+
+    def test_verify_email_confirm(self):
+        with self.assertQueryBudget(EmailVerificationConfirmView):
+            response = self.client.get(r(
+                'rest_auth:verify_email_confirm', kwargs={
+                    'uidb64': self.uidb64,
+                    'token': default_token_generator.make_token(self.user),
+                },
+            ))
+        self.assertEqual(response.status_code, 302)
+
+    def test_over_budget(self):
+        with patch.object(LoginView, 'query_budget', 0):
+            with self.assertRaises(QueryBudgetExceeded):
+                with self.assertQueryBudget(LoginView):
+                    self.client.post(r('rest_auth:login'), data={
+                        'username': 'user', 'password': 'pass',
+                    })
+
+    def test_is_counted(self):
+        self.assertTrue(is_counted('SELECT 1'))
+        for sql in ('BEGIN', 'SAVEPOINT "s1"', 'RELEASE SAVEPOINT "s1"',
+                    'ROLLBACK TO SAVEPOINT "s1"', 'COMMIT'):
+            self.assertFalse(is_counted(sql))
+
+
+@override_settings(DEBUG=True, MIDDLEWARE=MIDDLEWARE)
+class QueryBudgetMiddlewareTest(TestCase):
+    def setUp(self):
+        UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+    def login(self):
+        return self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+
+    def test_in_budget(self):
+        with patch.object(logging.getLogger('rest_auth.budgets'),
+                          'warning') as warning:
+            self.assertEqual(self.login().status_code, 200)
+        warning.assert_not_called()
+
+    @patch.object(LoginView, 'query_budget', 0)
+    def test_over_budget_is_logged(self):
+        with patch.object(logging.getLogger('rest_auth.budgets'),
+                          'warning') as warning:
+            self.assertEqual(self.login().status_code, 200)
+        warning.assert_called_once()
+
+    @patch.object(LoginView, 'query_budget', 0)
+    @override_settings(REST_AUTH_QUERY_BUDGET_RAISE=True)
+    def test_over_budget_raises(self):
+        with self.assertLogs('django.request', 'ERROR') as logs:
+            with self.assertRaises(QueryBudgetExceeded):
+                self.login()
+        self.assertIn('QueryBudgetExceeded', logs.output[0])
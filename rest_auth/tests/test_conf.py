@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from django.test.utils import override_settings
+from mock import patch
+from rest_auth.conf import auth_settings
+from rest_auth.serializers import LoginSerializer
+
+
+class AuthSettingsTest(TestCase):
+    def test_defaults(self):
+        self.assertIs(auth_settings.LOGIN_SERIALIZER_CLASS, LoginSerializer)
+        self.assertTrue(auth_settings.LOGIN_EMPTY_RESPONSE)
+
+    def test_invalid_setting(self):
+        with self.assertRaises(AttributeError):
+            auth_settings.NOT_A_SETTING
+
+    def test_import_is_cached(self):
+        auth_settings.LOGIN_SERIALIZER_CLASS
+        with patch('rest_auth.conf.import_string') as mock:
+            auth_settings.LOGIN_SERIALIZER_CLASS
+            mock.assert_not_called()
+
+    def test_reload_on_setting_changed(self):
+        self.assertTrue(auth_settings.LOGIN_EMPTY_RESPONSE)
+        with override_settings(REST_AUTH_LOGIN_EMPTY_RESPONSE=False):
+            self.assertFalse(auth_settings.LOGIN_EMPTY_RESPONSE)
+        self.assertTrue(auth_settings.LOGIN_EMPTY_RESPONSE)
+
+    def test_invalid_import(self):
+        path = 'rest_auth.serializers.NotASerializer'
+        with override_settings(REST_AUTH_LOGIN_SERIALIZER_CLASS=path):
+            with self.assertRaises(ImproperlyConfigured):
+                auth_settings.LOGIN_SERIALIZER_CLASS
+
+    def test_invalid_choice(self):
+        with override_settings(REST_AUTH_LOGIN_MODE='sessions'):
+            with self.assertRaises(ImproperlyConfigured):
+                auth_settings.LOGIN_MODE
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import smtplib
+import tempfile
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.mail import EmailMessage, get_connection
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from mock import patch
+from rest_auth import throttling
+from rest_auth.contrib import sessions
+from rest_auth.contrib.mail.backends import clear_pools
+from rest_auth.contrib.throttling import SharedMemoryBackend
+
+
+@patch('django.core.mail.backends.smtp.smtplib.SMTP')
+class PooledEmailBackendTest(TestCase):
+    BACKEND = 'rest_auth.contrib.mail.backends.PooledEmailBackend'
+
+    def setUp(self):
+        clear_pools()
+
+    def tearDown(self):
+        clear_pools()
+
+    def send(self, count=1):
+        connection = get_connection(self.BACKEND)
+        messages = [
+            EmailMessage('subject', 'body', 'from@a.com', ['to@a.com'])
+            for _ in range(count)
+        ]
+        return connection.send_messages(messages)
+
+    def test_connection_is_reused(self, smtp):
+        smtp.return_value.noop.return_value = (250, b'OK')
+
+        self.assertEqual(self.send(3), 3)
+        self.assertEqual(self.send(), 1)
+
+        self.assertEqual(smtp.call_count, 1)
+        self.assertEqual(smtp.return_value.sendmail.call_count, 4)
+        smtp.return_value.quit.assert_not_called()
+
+    def test_dead_connection_is_replaced(self, smtp):
+        smtp.return_value.noop.side_effect = smtplib.SMTPServerDisconnected
+
+        self.send()
+        self.send()
+
+        self.assertEqual(smtp.call_count, 2)
+
+    @override_settings(REST_AUTH_EMAIL_POOL_SIZE=0)
+    def test_pool_full(self, smtp):
+        self.send()
+        self.send()
+
+        self.assertEqual(smtp.call_count, 2)
+        self.assertEqual(smtp.return_value.quit.call_count, 2)
+
+    def test_broken_connection_is_not_pooled(self, smtp):
+        smtp.return_value.noop.return_value = (250, b'OK')
+        smtp.return_value.sendmail.side_effect = smtplib.SMTPException
+
+        with self.assertRaises(smtplib.SMTPException):
+            self.send()
+        smtp.return_value.quit.assert_called_once_with()
+
+        smtp.return_value.sendmail.side_effect = None
+        self.send()
+        self.assertEqual(smtp.call_count, 2)
+
+
+class SharedMemoryBackendTest(TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+        self.backend = SharedMemoryBackend(self.path, slots=128)
+        self.addCleanup(self.backend.close)
+
+    def test_incr(self):
+        self.assertEqual(self.backend.get('a'), 0)
+        self.assertEqual(self.backend.incr('a', 60), 1)
+        self.assertEqual(self.backend.incr('a', 60), 2)
+        self.assertEqual(self.backend.incr('b', 60), 1)
+        self.assertEqual(self.backend.get('a'), 2)
+
+    def test_expires(self):
+        self.backend.incr('a', 60)
+        with patch('time.time', return_value=time.time() + 120):
+            self.assertEqual(self.backend.get('a'), 0)
+            self.assertEqual(self.backend.incr('a', 60), 1)
+
+    def test_full_table(self):
+        # more keys than slots: oldest counters are dropped.
+        for i in range(1000):
+            self.backend.incr('key-%d' % i, 60)
+        self.assertEqual(self.backend.incr('key-999', 60), 2)
+
+    def test_shared_between_processes(self):
+        def work():
+            backend = SharedMemoryBackend(self.path, slots=128)
+            for _ in range(200):
+                backend.incr('a', 60)
+            os._exit(0)
+
+        pids = []
+        for _ in range(4):
+            pid = os.fork()
+            if pid == 0:  # pragma: no cover
+                work()
+            pids.append(pid)
+        for pid in pids:
+            os.waitpid(pid, 0)
+
+        self.assertEqual(self.backend.get('a'), 800)
+
+    def test_throttle_backend(self):
+        rates = {'login': '1/min'}
+        with override_settings(
+            REST_AUTH_THROTTLE_RATES=rates,
+            REST_AUTH_THROTTLE_SHM_PATH=self.path,
+            REST_AUTH_THROTTLE_BACKEND=(
+                'rest_auth.contrib.throttling.SharedMemoryBackend'
+            ),
+        ):
+            data = {'username': 'user', 'password': 'pass'}
+            response = self.client.post(r('rest_auth:login'), data=data)
+            self.assertEqual(response.status_code, 400)
+            response = self.client.post(r('rest_auth:login'), data=data)
+            self.assertEqual(response.status_code, 429)
+            backend = throttling.get_backend()
+
+        # closed when the setting is reloaded.
+        self.assertTrue(backend.buffer.closed)
+
+
+@override_settings(
+    SESSION_ENGINE='rest_auth.contrib.sessions',
+    REST_AUTH_SESSION_FLUSH_INTERVAL=3600,
+)
+class WriteBehindSessionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(sessions.flush)
+
+    def create(self):
+        session = sessions.SessionStore()
+        session['key'] = 'value'
+        with self.assertNumQueries(0):
+            session.save()
+        return session.session_key
+
+    def test_save_is_buffered(self):
+        session_key = self.create()
+
+        self.assertFalse(Session.objects.exists())
+        with self.assertNumQueries(0):
+            session = sessions.SessionStore(session_key)
+            self.assertEqual(session['key'], 'value')
+
+        self.assertEqual(sessions.flush(), 1)
+        self.assertTrue(Session.objects.filter(pk=session_key).exists())
+
+        # loaded from database, if cache misses.
+        cache.clear()
+        self.assertEqual(sessions.SessionStore(session_key)['key'], 'value')
+
+    def test_last_write_wins(self):
+        session_key = self.create()
+        sessions.flush()
+
+        session = sessions.SessionStore(session_key)
+        session['key'] = 'changed'
+        session.save()
+        session['key'] = 'changed again'
+        session.save()
+
+        self.assertEqual(sessions.flush(), 1)
+        cache.clear()
+        self.assertEqual(
+            sessions.SessionStore(session_key)['key'], 'changed again',
+        )
+
+    def test_deleted_session_is_not_loaded(self):
+        session_key = self.create()
+        sessions.flush()
+
+        sessions.SessionStore(session_key).flush()
+        # row is not deleted yet.
+        self.assertTrue(Session.objects.filter(pk=session_key).exists())
+
+        session = sessions.SessionStore(session_key)
+        self.assertNotIn('key', session)
+        self.assertFalse(session.exists(session_key))
+
+        sessions.flush()
+        self.assertFalse(Session.objects.filter(pk=session_key).exists())
+
+    def test_login_logout(self):
+        get_user_model()._default_manager.create_user(
+            username='user', password='pass',
+        )
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        self.assertEqual(response.status_code, 200)
+        sessions.flush()
+        self.assertEqual(Session.objects.count(), 1)
+
+        response = self.client.post(r('rest_auth:logout'))
+        self.assertEqual(response.status_code, 200)
+        sessions.flush()
+        self.assertFalse(Session.objects.exists())
+
+    @override_settings(REST_AUTH_SESSION_FLUSH_INTERVAL=0)
+    def test_write_through(self):
+        session = sessions.SessionStore()
+        session['key'] = 'value'
+        session.save()
+
+        self.assertTrue(Session.objects.filter(
+            pk=session.session_key,
+        ).exists())
+        self.assertEqual(sessions.flush(), 0)
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse as r
+from rest_auth import hashing
+from rest_auth.serializers import SignupSerializer
+
+UserModel = get_user_model()
+
+
+class HashingExecutorTest(TestCase):
+    def test_inline_by_default(self):
+        self.assertIsNone(hashing.get_executor())
+        self.assertEqual(hashing.run(sum, [1, 2]), 3)
+        self.assertEqual(hashing.stats(), {})
+
+    @override_settings(REST_AUTH_HASHING_EXECUTOR='thread')
+    def test_thread_executor(self):
+        self.assertEqual(hashing.run(sum, [1, 2]), 3)
+
+        stats = hashing.stats()
+        self.assertEqual(stats['calls'], 1)
+        self.assertEqual(stats['depth'], 0)
+        self.assertEqual(stats['max_depth'], 1)
+
+    def test_queue_full(self):
+        executor = hashing.HashingExecutor(
+            'thread', max_workers=1, max_queue=0, queue_timeout=0.01,
+        )
+        self.addCleanup(executor.shutdown)
+
+        started, finish = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            finish.wait()
+
+        thread = threading.Thread(target=executor.run, args=(block, ))
+        thread.start()
+        started.wait()
+
+        with self.assertRaises(hashing.HashingUnavailable):
+            executor.run(sum, [1, 2])
+
+        finish.set()
+        thread.join()
+        self.assertEqual(executor.run(sum, [1, 2]), 3)
+
+    def test_invalid_executor(self):
+        with self.assertRaises(ValueError):
+            hashing.HashingExecutor('fork')
+
+    @override_settings(REST_AUTH_HASHING_EXECUTOR='thread')
+    def test_signup_hashes_through_executor(self):
+        serializer = SignupSerializer(data={
+            'username': 'test-user',
+            'email': 'a@a.com',
+            'password1': '23tf123g@f',
+            'password2': '23tf123g@f',
+        })
+        self.assertTrue(serializer.is_valid())
+        user = serializer.save()
+
+        self.assertTrue(check_password('23tf123g@f', user.password))
+        self.assertEqual(hashing.stats()['calls'], 1)
+
+    @override_settings(
+        REST_AUTH_HASHING_EXECUTOR='thread',
+        AUTHENTICATION_BACKENDS=['rest_auth.backends.ModelBackend'],
+    )
+    def test_login_hashes_through_executor(self):
+        user = UserModel._default_manager.create_user(
+            username='test-user',
+        )
+        UserModel._default_manager.filter(pk=user.pk).update(
+            password=make_password('23tf123g@f', hasher='pbkdf2_sha1'),
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(r('rest_auth:login'), data={
+                'username': 'test-user', 'password': '23tf123g@f',
+            })
+        self.assertEqual(response.status_code, 200)
+        # check_password, and make_password of the upgraded hash.
+        self.assertEqual(hashing.stats()['calls'], 2)
+
+        # user is fetched & upgraded in the request thread.
+        self.assertTrue(any(
+            query['sql'].startswith('SELECT') and '"auth_user"' in query['sql']
+            for query in queries
+        ))
+        self.assertTrue(any(
+            query['sql'].startswith('UPDATE "auth_user" SET "password"')
+            for query in queries
+        ))
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+
+    @override_settings(
+        REST_AUTH_HASHING_EXECUTOR='thread',
+        AUTHENTICATION_BACKENDS=['rest_auth.backends.ModelBackend'],
+    )
+    def test_login_fails_through_executor(self):
+        UserModel._default_manager.create_user(
+            username='test-user', password='23tf123g@f',
+        )
+
+        for username in ('test-user', 'unknown-user'):
+            response = self.client.post(r('rest_auth:login'), data={
+                'username': username, 'password': 'wrong-password',
+            })
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(hashing.stats()['calls'], 2)
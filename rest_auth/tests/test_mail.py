@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone, translation
+from mock import patch
+from rest_auth.mail import drain_outbox, templates
+from rest_auth.models import OutboxMessage
+from rest_auth.serializers import PasswordResetSerializer, SignupSerializer
+
+UserModel = get_user_model()
+
+
+@override_settings(REST_AUTH_EMAIL_OUTBOX=True)
+class OutboxTest(TestCase):
+    def setUp(self):
+        UserModel._default_manager.create_user(
+            username='test-user', password='test-password',
+            email='test@test.com',
+        )
+
+    def forgot(self):
+        serializer = PasswordResetSerializer(data={'email': 'test@test.com'})
+        self.assertTrue(serializer.is_valid())
+        serializer.save(
+            request=RequestFactory().get('/'),
+            html_email_template_name='registration/password_reset_email.html',
+        )
+
+    def test_password_reset_is_queued(self):
+        self.forgot()
+
+        # nothing is sent inside a request.
+        self.assertEqual(len(mail.outbox), 0)
+
+        outbox_message = OutboxMessage.objects.get()
+        self.assertEqual(outbox_message.to, 'test@test.com')
+        self.assertTrue(outbox_message.html_body)
+
+    @override_settings(REST_AUTH_SIGNUP_REQUIRE_EMAIL_CONFIRMATION=True)
+    def test_verification_is_queued(self):
+        serializer = SignupSerializer(data={
+            'username': 'new-user',
+            'email': 'a@a.com',
+            'password1': '23tf123g@f',
+            'password2': '23tf123g@f',
+        })
+        self.assertTrue(serializer.is_valid())
+        serializer.save(email_opts={'request': RequestFactory().get('/')})
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.get().to, 'a@a.com')
+
+    def test_command_delivers_outbox(self):
+        self.forgot()
+        self.forgot()
+
+        call_command('rest_auth_outbox', batch_size=1, stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['test@test.com'])
+        self.assertEqual(mail.outbox[0].alternatives[0][1], 'text/html')
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    @override_settings(REST_AUTH_EMAIL_OUTBOX_MAX_ATTEMPTS=2)
+    @patch('django.core.mail.backends.locmem.EmailBackend.send_messages')
+    def test_retry_with_backoff(self, mock):
+        mock.side_effect = OSError('intended side effect')
+        self.forgot()
+
+        self.assertEqual(drain_outbox(), (0, 1))
+        outbox_message = OutboxMessage.objects.get()
+        self.assertEqual(outbox_message.attempts, 1)
+        self.assertIn('intended side effect', outbox_message.last_error)
+        self.assertGreater(outbox_message.next_attempt_at, timezone.now())
+
+        # message is not due yet.
+        self.assertEqual(drain_outbox(), (0, 0))
+
+        # abandoned after max attempts.
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(), (0, 1))
+        outbox_message.refresh_from_db()
+        self.assertEqual(outbox_message.attempts, 2)
+        self.assertIsNone(outbox_message.next_attempt_at)
+
+    @patch('django.core.mail.backends.locmem.EmailBackend.open')
+    def test_retry_if_connection_fails(self, mock):
+        mock.side_effect = OSError('intended side effect')
+        self.forgot()
+        self.forgot()
+
+        self.assertEqual(drain_outbox(), (0, 2))
+        for outbox_message in OutboxMessage.objects.all():
+            self.assertEqual(outbox_message.attempts, 1)
+            self.assertIn('intended side effect', outbox_message.last_error)
+            self.assertGreater(
+                outbox_message.next_attempt_at, timezone.now(),
+            )
+
+        # delivered after the server is back.
+        mock.side_effect = None
+        OutboxMessage.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+
+class TemplateCacheTest(TestCase):
+    def setUp(self):
+        templates.clear()
+
+    def render(self):
+        return templates.render_to_string(
+            'registration/verify_email.txt', {'site_name': 'eugene.io'},
+        )
+
+    def test_templates_are_cached(self):
+        self.render()
+        self.assertIn('eugene.io', self.render())
+        self.assertEqual(
+            templates.info(), {'hits': 1, 'misses': 1, 'size': 1},
+        )
+
+    def test_cached_per_language(self):
+        self.render()
+        with translation.override('ko'):
+            self.render()
+
+        self.assertEqual(templates.info()['misses'], 2)
+
+    def test_password_reset_uses_cache(self):
+        UserModel._default_manager.create_user(
+            username='test-user', password='test-password',
+            email='test@test.com',
+        )
+        for _ in range(2):
+            serializer = PasswordResetSerializer(
+                data={'email': 'test@test.com'},
+            )
+            self.assertTrue(serializer.is_valid())
+            serializer.save(request=RequestFactory().get('/'))
+
+        # subject & body templates are compiled only once.
+        self.assertEqual(templates.info()['misses'], 2)
+        self.assertEqual(templates.info()['hits'], 2)
+
+    def test_cache_disabled(self):
+        with override_settings(REST_AUTH_EMAIL_TEMPLATE_CACHE=False):
+            self.render()
+            self.render()
+            self.assertEqual(templates.info()['size'], 0)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import unittest
+
+from django.core.cache import cache
+from django.test import TestCase
+from rest_auth import bench
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'memory_baseline.json')
+
+
+class MemoryBudgetTest(TestCase):
+    """Peak & retained allocations of each endpoint are compared with
+    ``memory_baseline.json``. (see ``rest_auth.bench``)
+    """
+    @classmethod
+    def setUpTestData(cls):
+        bench.create_users(100)
+
+    def setUp(self):
+        # NOTE entries left by other tests change what the cache retains.
+        cache.clear()
+
+    @unittest.skipUnless(
+        os.environ.get('REST_AUTH_MEMORY_BASELINE'),
+        'byte counts depend on python & library versions. '
+        '(set REST_AUTH_MEMORY_BASELINE=1)',
+    )
+    def test_baseline(self):
+        results = bench.run_memory()
+        if os.environ['REST_AUTH_MEMORY_BASELINE'] == 'record':
+            bench.save_baseline(BASELINE, results)
+            return
+
+        errors = bench.compare_baseline(
+            results, bench.load_baseline(BASELINE),
+        )
+        self.assertEqual(errors, [], results)
+
+    def test_run_memory(self):
+        results = bench.run_memory(scenarios=['login', 'logout'], requests=3)
+
+        self.assertEqual(list(results), ['login', 'logout'])
+        for result in results.values():
+            self.assertEqual(result['requests'], 3)
+            self.assertGreater(result['peak'], 0)
+            self.assertGreaterEqual(result['retained'], 0)
+
+    def test_compare_baseline(self):
+        baseline = {'login': {'peak': 1000, 'retained': 0}}
+
+        self.assertEqual(bench.compare_baseline(
+            {'login': {'peak': 1250, 'retained': 1024}}, baseline,
+        ), [])
+        self.assertEqual(bench.compare_baseline(
+            {'login': {'peak': 1251, 'retained': 1025}}, baseline,
+        ), [
+            'login: peak 1251 bytes > 1250 bytes',
+            'login: retained 1025 bytes/request > 1024 bytes',
+        ])
+        self.assertEqual(bench.compare_baseline(
+            {'logout': {'peak': 0, 'retained': 0}}, baseline,
+        ), ['logout: no baseline'])
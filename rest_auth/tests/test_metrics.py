@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.urls import reverse as r
+from rest_auth import metrics
+
+UserModel = get_user_model()
+
+
+class RegistryTest(TestCase):
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter(self):
+        counter = self.registry.counter('test_total', 'Test.', ('a', ))
+        counter.inc(('x', ))
+        counter.inc(('x', ), amount=2)
+        self.assertEqual(counter.get(('x', )), 3)
+        self.assertEqual(counter.get(('y', )), 0)
+
+    def test_histogram(self):
+        histogram = self.registry.histogram(
+            'test_seconds', 'Test.', buckets=(0.1, 1),
+        )
+        for value in (0.05, 0.1, 0.5, 5):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.get(), {
+            'buckets': [(0.1, 2), (1, 3), (float('inf'), 4)],
+            'count': 4,
+            'sum': 5.65,
+        })
+
+    def test_threads(self):
+        counter = self.registry.counter('test_total', 'Test.')
+
+        def inc():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=inc) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.get(), 8000)
+
+    def test_duplicated(self):
+        self.registry.counter('test_total', 'Test.')
+        with self.assertRaises(ValueError):
+            self.registry.counter('test_total', 'Test.')
+
+    def test_expose(self):
+        counter = self.registry.counter('test_total', 'Test.', ('a', ))
+        counter.inc(('"x"', ))
+        histogram = self.registry.histogram(
+            'test_seconds', 'Test.', buckets=(1, ),
+        )
+        histogram.observe(0.5)
+
+        self.assertEqual(self.registry.expose(), '\n'.join([
+            '# HELP test_seconds Test.',
+            '# TYPE test_seconds histogram',
+            'test_seconds_bucket{le="1.0"} 1.0',
+            'test_seconds_bucket{le="+Inf"} 1.0',
+            'test_seconds_sum 0.5',
+            'test_seconds_count 1.0',
+            '# HELP test_total Test.',
+            '# TYPE test_total counter',
+            'test_total{a="\\"x\\""} 1.0',
+        ]) + '\n')
+
+
+class ViewMetricsTest(TestCase):
+    def setUp(self):
+        metrics.registry.clear()
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+    def assertRequests(self, endpoint, outcome, count=1):
+        self.assertEqual(
+            metrics.requests_total.get((endpoint, outcome)), count,
+        )
+
+    def test_login(self):
+        self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'wrong',
+        })
+
+        self.assertRequests('login', 'success')
+        self.assertRequests('login', 'invalid_login')
+        self.assertEqual(
+            metrics.request_duration.get(('login', ))['count'], 2,
+        )
+
+    def test_signup(self):
+        self.client.post(r('rest_auth:signup'), data={
+            'username': 'new-user',
+            'email': 'new-user@localhost',
+            'password1': 'password1!',
+            'password2': 'password2!',
+        })
+        self.assertRequests('signup', 'password_mismatch')
+
+    def test_password_change(self):
+        self.client.force_login(self.user)
+        self.client.post(r('rest_auth:password_change'), data={
+            'old_password': 'wrong',
+            'new_password1': 'new-password',
+            'new_password2': 'new-password',
+        })
+        self.assertRequests('password_change', 'password_incorrect')
+
+    def test_not_authenticated(self):
+        self.client.post(r('rest_auth:logout'))
+        self.assertRequests('logout', 'not_authenticated')
+
+    def test_invalid_link(self):
+        self.client.get(r('rest_auth:verify_email_confirm', kwargs={
+            'uidb64': 'MQ', 'token': '1-' + '0' * 22,
+        }))
+        self.assertRequests('verify_email_confirm', 'invalid_link')
+
+    def test_metrics_view(self):
+        self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        response = metrics.metrics_view(RequestFactory().get('/'))
+
+        self.assertEqual(response['Content-Type'], metrics.CONTENT_TYPE)
+        self.assertIn(
+            b'rest_auth_requests_total{endpoint="login",outcome="success"} '
+            b'1.0',
+            response.content,
+        )
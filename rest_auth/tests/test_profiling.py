@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from mock import patch
+from rest_auth import profiling
+
+UserModel = get_user_model()
+
+
+class ProfilingTest(TestCase):
+    def setUp(self):
+        UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def login(self, **extra):
+        return self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        }, **extra)
+
+    def get_profiles(self):
+        return profiling.get_profiles(self.directory)
+
+    def test_disabled(self):
+        with patch('cProfile.Profile') as profile:
+            self.assertEqual(self.login().status_code, 200)
+        profile.assert_not_called()
+
+    def test_sample_rate(self):
+        with self.settings(REST_AUTH_PROFILE_DIR=self.directory,
+                           REST_AUTH_PROFILE_SAMPLE_RATE=1):
+            self.assertEqual(self.login().status_code, 200)
+
+        profiles = self.get_profiles()
+        self.assertEqual(len(profiles), 1)
+        self.assertTrue(os.path.basename(profiles[0]).startswith('login-'))
+
+    def test_header(self):
+        with self.settings(REST_AUTH_PROFILE_DIR=self.directory):
+            self.login(HTTP_X_REST_AUTH_PROFILE='invalid')
+            self.assertEqual(self.get_profiles(), [])
+
+            self.login(
+                HTTP_X_REST_AUTH_PROFILE=profiling.make_profile_header(),
+            )
+            self.assertEqual(len(self.get_profiles()), 1)
+
+    def test_unwritable_directory(self):
+        path = os.path.join(self.directory, 'file')
+        open(path, 'w').close()
+
+        # a file is not a directory.
+        with self.settings(REST_AUTH_PROFILE_DIR=os.path.join(path, 'dir'),
+                           REST_AUTH_PROFILE_SAMPLE_RATE=1):
+            with self.assertLogs('rest_auth.profiling', 'ERROR'):
+                self.assertEqual(self.login().status_code, 200)
+
+    def test_rotate(self):
+        with self.settings(REST_AUTH_PROFILE_DIR=self.directory,
+                           REST_AUTH_PROFILE_SAMPLE_RATE=1,
+                           REST_AUTH_PROFILE_MAX_FILES=2):
+            for _ in range(3):
+                self.login()
+        self.assertEqual(len(self.get_profiles()), 2)
+
+    @override_settings(REST_AUTH_PROFILE_SAMPLE_RATE=1)
+    def test_summarize(self):
+        with self.settings(REST_AUTH_PROFILE_DIR=self.directory):
+            self.login()
+            self.login()
+            self.client.post(r('rest_auth:logout'))
+
+        summary = profiling.summarize(self.directory, top=5)
+        self.assertEqual(set(summary), {'login', 'logout'})
+
+        requests, frames = summary['login']
+        self.assertEqual(requests, 2)
+        self.assertEqual(len(frames), 5)
+        cumtimes = [cumtime for _, _, _, cumtime in frames]
+        self.assertEqual(cumtimes, sorted(cumtimes, reverse=True))
+
+        stdout = StringIO()
+        call_command('rest_auth_profile', dir=self.directory, stdout=stdout)
+        self.assertIn('login (2 requests)', stdout.getvalue())
@@ -1,18 +1,25 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
+from importlib import import_module
+
 import rest_framework
 from django import forms
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.core.mail.backends.dummy import EmailBackend
+from django.db import connection
 from django.test import TestCase
 from django.test.client import RequestFactory
-from django.test.utils import override_settings
-from mock import patch
+from django.test.utils import CaptureQueriesContext, override_settings
+from mock import Mock, patch
+from rest_auth.forms import PasswordResetForm
 from rest_auth.serializers import (
     LoginSerializer, PasswordChangeSerializer, PasswordResetSerializer,
-    SignupSerializer,
+    SignupSerializer, get_suppressed_password_resets,
 )
+from rest_framework import serializers
 from rest_framework.settings import api_settings
 
 UserModel = get_user_model()
@@ -53,6 +60,25 @@ class SignupSerializerTest(TestCase):
         # SignupSerializer should not save raw password
         self.assertNotEqual(user.password, data['password1'])
 
+    def test_create_user_with_groups(self):
+        group = Group.objects.create(name='group')
+
+        class GroupSignupSerializer(SignupSerializer):
+            class Meta(SignupSerializer.Meta):
+                fields = SignupSerializer.Meta.fields + ('groups', )
+
+        serializer = GroupSignupSerializer(data={
+            'username': 'test-user',
+            'email': 'a@a.com',
+            'password1': '23tf123g@f',
+            'password2': '23tf123g@f',
+            'groups': [group.pk],
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+        user = serializer.save()
+        self.assertEqual(list(user.groups.all()), [group])
+
     @override_settings(REST_AUTH_SIGNUP_REQUIRE_EMAIL_CONFIRMATION=True)
     @override_settings(EMAIL_BACKEND=TEST_EMAIL_BACKEND)
     def test_create_user_requires_email_confirmation(self):
@@ -99,6 +125,47 @@ class SignupSerializerTest(TestCase):
             }
         )
 
+    def test_create_user_by_single_query(self):
+        data = {
+            'username': 'test-user',
+            'email': 'a@a.com',
+            'password1': '23tf123g@f',
+            'password2': '23tf123g@f',
+        }
+
+        with CaptureQueriesContext(connection) as context:
+            serializer = SignupSerializer(data=data)
+            self.assertTrue(serializer.is_valid())
+            user = serializer.save()
+
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'SAVEPOINT' not in query['sql']
+        ]
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0].startswith('INSERT'))
+
+        user.refresh_from_db()
+        self.assertTrue(user.check_password(data['password1']))
+
+    def test_duplicated_username(self):
+        UserModel._default_manager.create_user(username='test-user')
+        data = {
+            'username': 'test-user',
+            'email': 'a@a.com',
+            'password1': '23tf123g@f',
+            'password2': '23tf123g@f',
+        }
+
+        serializer = SignupSerializer(data=data)
+        self.assertTrue(serializer.is_valid())
+        with self.assertRaises(serializers.ValidationError) as context:
+            serializer.save()
+
+        self.assertEqual(context.exception.detail['username'][0].code,
+                         'unique')
+        self.assertEqual(UserModel._default_manager.count(), 1)
+
     def test_required_fields(self):
         data = {
             'username': '',
@@ -254,6 +321,65 @@ class PasswordResetSerializerTest(TestCase):
         serializer.save(request=request)
         self.assertEqual(len(_TestEmailBackend.email_buffer), 0)
 
+    def test_case_insensitive_email(self):
+        serializer = PasswordResetSerializer(data={'email': 'TEST@test.com'})
+        self.assertTrue(serializer.is_valid())
+
+        users = list(serializer.form.get_users('TEST@test.com'))
+        self.assertEqual([user.username for user in users], ['test-user'])
+
+    def test_email_index_is_used(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('query plan is checked on sqlite only')
+
+        queryset = PasswordResetForm().get_user_queryset('test@test.com')
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            plan = ' '.join(str(row) for row in cursor.fetchall())
+
+        self.assertIn('rest_auth_email_lower_idx', plan)
+
+    def test_email_index_is_skipped_on_old_mysql(self):
+        migration = import_module(
+            'rest_auth.migrations.0003_email_lower_index',
+        )
+        for is_mariadb, version, supported in (
+            (False, (8, 0, 13), True),
+            (False, (5, 7, 30), False),
+            (True, (10, 5, 0), False),
+        ):
+            connection = Mock(
+                vendor='mysql', mysql_is_mariadb=is_mariadb,
+                mysql_version=version,
+            )
+            self.assertEqual(
+                migration._supports_index(connection), supported,
+            )
+
+    @override_settings(EMAIL_BACKEND=TEST_EMAIL_BACKEND,
+                       REST_AUTH_PASSWORD_RESET_COOLDOWN=60)
+    def test_cooldown(self):
+        cache.clear()
+        request = RequestFactory().get('/')
+
+        serializer = PasswordResetSerializer(data={'email': 'test@test.com'})
+        self.assertTrue(serializer.is_valid())
+        serializer.save(request=request)
+        self.assertEqual(len(_TestEmailBackend.email_buffer), 1)
+        _TestEmailBackend.email_buffer.pop()
+
+        serializer = PasswordResetSerializer(data={'email': 'TEST@test.com'})
+        self.assertTrue(serializer.is_valid())
+        render = 'rest_auth.mail.TemplateCache.render_to_string'
+        with self.assertNumQueries(0), patch(render) as mock:
+            serializer.save(request=request)
+        mock.assert_not_called()
+
+        self.assertEqual(len(_TestEmailBackend.email_buffer), 0)
+        self.assertEqual(get_suppressed_password_resets(), 1)
+
     def test_invalid_data(self):
         serializer = PasswordResetSerializer(data={})
         self.assertFalse(serializer.is_valid())
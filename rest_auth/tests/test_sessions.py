@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse as r
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_auth.models import UserSession
+from rest_auth.sessions import refresh_user_sessions, revoke_user_sessions
+from rest_auth.tokens import default_token_generator
+
+UserModel = get_user_model()
+
+
+class UserSessionTest(TestCase):
+    def setUp(self):
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+        self.other = UserModel._default_manager.create_user(
+            username='other', password='pass', email='other@localhost',
+        )
+
+    def login(self, client=None, username='user'):
+        client = client or Client()
+        response = client.post(r('rest_auth:login'), data={
+            'username': username, 'password': 'pass',
+        })
+        self.assertEqual(response.status_code, 200)
+        return client
+
+    def get_session_keys(self, user=None):
+        return set(UserSession.objects.filter(
+            user=user or self.user,
+        ).values_list('session_key', flat=True))
+
+    def assertLoggedIn(self, client, logged_in=True):
+        response = client.post(r('rest_auth:logout'))
+        self.assertEqual(response.status_code, 200 if logged_in else 403)
+
+    def test_login_and_logout(self):
+        client = self.login()
+        session_key = client.session.session_key
+        self.assertEqual(self.get_session_keys(), {session_key})
+
+        client.post(r('rest_auth:logout'))
+        self.assertEqual(self.get_session_keys(), set())
+
+    @override_settings(REST_AUTH_LOGIN_MODE='token')
+    def test_token_login(self):
+        self.login()
+        self.assertEqual(self.get_session_keys(), set())
+
+    def test_logout_all(self):
+        clients = [self.login(), self.login()]
+        other = self.login(username='other')
+
+        response = clients[0].post(r('rest_auth:logout_all'))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.get_session_keys(), set())
+        for client in clients:
+            self.assertLoggedIn(client, False)
+        self.assertLoggedIn(other)
+
+    def change_password(self, client):
+        response = client.post(r('rest_auth:password_change'), data={
+            'old_password': 'pass',
+            'new_password1': 'new-password',
+            'new_password2': 'new-password',
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_password_change(self):
+        client, device = self.login(), self.login()
+        session_key = client.session.session_key
+        device_key = device.session.session_key
+
+        with CaptureQueriesContext(connection) as queries:
+            self.change_password(client)
+        updates = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('UPDATE "auth_user"')
+        ]
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(updates[0].startswith(
+            'UPDATE "auth_user" SET "password" = ',
+        ))
+        self.assertNotIn('"last_login"', updates[0])
+
+        # the session is kept in place.
+        self.assertEqual(client.session.session_key, session_key)
+        self.assertEqual(self.get_session_keys(), {session_key})
+        self.assertFalse(
+            Session.objects.filter(session_key=device_key).exists(),
+        )
+        self.assertLoggedIn(client)
+
+    @override_settings(REST_AUTH_PASSWORD_CHANGE_REVOKE=())
+    def test_password_change_without_revoke(self):
+        client, device = self.login(), self.login()
+        other = self.login(username='other')
+        device_key = device.session.session_key
+
+        self.change_password(client)
+
+        self.assertEqual(
+            self.get_session_keys(),
+            {client.session.session_key, device_key},
+        )
+        self.assertLoggedIn(device)
+        self.assertLoggedIn(client)
+        self.assertLoggedIn(other)
+
+    def test_refresh_user_sessions(self):
+        client = self.login()
+        # an entry of a flushed session. (django flushes a session of
+        # a changed password without ``user_logged_out``)
+        UserSession.objects.create(
+            session_key='x' * 32, user=self.user, expire_date=timezone.now(),
+        )
+
+        old_hash = self.user.get_session_auth_hash()
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(refresh_user_sessions(self.user, old_hash), 1)
+        self.assertEqual(
+            self.get_session_keys(), {client.session.session_key},
+        )
+        self.assertLoggedIn(client)
+
+    @override_settings(REST_AUTH_PASSWORD_CHANGE_REVOKE=())
+    def test_password_change_keeps_logged_out_sessions(self):
+        stolen = self.login()
+        stolen_key = stolen.session.session_key
+
+        # logged out by django, when an admin sets a password.
+        self.user.set_password('pass')
+        self.user.save()
+
+        client = self.login()
+        self.change_password(client)
+
+        self.assertLoggedIn(stolen, False)
+        self.assertFalse(
+            Session.objects.filter(session_key=stolen_key).exists(),
+        )
+        self.assertEqual(
+            self.get_session_keys(), {client.session.session_key},
+        )
+
+    def test_password_reset(self):
+        device = self.login()
+        self.user.refresh_from_db()
+
+        client = Client()
+        response = client.get(r('rest_auth:password_reset_confirm', kwargs={
+            'uidb64': urlsafe_base64_encode(force_bytes(self.user.pk)),
+            'token': default_token_generator.make_token(self.user),
+        }))
+        response = client.post(response.url, data={
+            'new_password1': 'new-password',
+            'new_password2': 'new-password',
+        })
+        self.assertEqual(response.status_code, 302)
+
+        self.assertEqual(self.get_session_keys(), set())
+        self.assertLoggedIn(device, False)
+
+    def test_revoke_user_sessions(self):
+        self.login()
+        self.login()
+        self.login(username='other')
+
+        with self.assertNumQueries(1):
+            self.assertEqual(revoke_user_sessions(UserModel(pk=0)), 0)
+        self.assertEqual(revoke_user_sessions(self.user), 2)
+        self.assertEqual(self.get_session_keys(), set())
+        self.assertEqual(len(self.get_session_keys(self.other)), 1)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from mock import patch
+from rest_auth.throttling import LoginRateThrottle
+
+UserModel = get_user_model()
+
+
+class ThrottleTestMixin(object):
+    def setUp(self):
+        cache.clear()
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+
+@override_settings(REST_AUTH_THROTTLE_RATES={'login': '2/min'})
+class LoginRateThrottleTest(ThrottleTestMixin, TestCase):
+    def login(self, username='user', password='bad'):
+        return self.client.post(r('rest_auth:login'), data={
+            'username': username, 'password': password,
+        })
+
+    def test_throttled_before_authentication(self):
+        self.assertEqual(self.login().status_code, 400)
+        self.assertEqual(self.login().status_code, 400)
+
+        with patch('django.contrib.auth.authenticate') as mock:
+            response = self.login(password='pass')
+            mock.assert_not_called()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    def test_throttled_per_username(self):
+        self.login()
+        self.login()
+        self.assertEqual(self.login(username='USER ').status_code, 429)
+        self.assertEqual(self.login(username='other').status_code, 400)
+
+    @override_settings(REST_AUTH_THROTTLE_RATES={})
+    def test_disabled(self):
+        for _ in range(3):
+            self.assertEqual(self.login().status_code, 400)
+
+    def test_sliding_window(self):
+        throttle = LoginRateThrottle()
+        request = self.client.post(r('rest_auth:login')).wsgi_request
+        request.data = {'username': 'user'}
+
+        with patch.object(throttle, 'timer', return_value=60):
+            self.assertTrue(throttle.allow_request(request, None))
+            self.assertTrue(throttle.allow_request(request, None))
+
+        # previous window counts 2 * (1 - 0.25)
+        with patch.object(throttle, 'timer', return_value=135):
+            self.assertFalse(throttle.allow_request(request, None))
+            self.assertAlmostEqual(throttle.wait(), 45)
+
+        # throttled request is counted. 1 * (1 - 0.75) + 1
+        with patch.object(throttle, 'timer', return_value=225):
+            self.assertTrue(throttle.allow_request(request, None))
+
+
+@override_settings(REST_AUTH_THROTTLE_RATES={
+    'forgot': '1/min', 'signup': '1/min', 'password_change': '1/min',
+})
+class ThrottledViewsTest(ThrottleTestMixin, TestCase):
+    def test_forgot(self):
+        data = {'email': 'user@localhost'}
+        self.client.post(r('rest_auth:forgot'), data=data)
+        response = self.client.post(r('rest_auth:forgot'), data=data)
+        self.assertEqual(response.status_code, 429)
+
+    def test_signup(self):
+        self.client.post(r('rest_auth:signup'), data={})
+        response = self.client.post(r('rest_auth:signup'), data={})
+        self.assertEqual(response.status_code, 429)
+
+    def test_password_change(self):
+        self.client.login(username='user', password='pass')
+        self.client.post(r('rest_auth:password_change'), data={})
+        response = self.client.post(r('rest_auth:password_change'), data={})
+        self.assertEqual(response.status_code, 429)
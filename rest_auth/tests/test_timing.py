@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from mock import patch
+from rest_auth import timing
+
+UserModel = get_user_model()
+
+MIDDLEWARE = [
+    'rest_auth.middleware.ServerTimingMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+]
+
+
+class StageTest(TestCase):
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+
+    def test_disabled(self):
+        with patch.object(timing, 'record') as record:
+            with timing.stage(self.request, 'stage'):
+                pass
+        record.assert_not_called()
+        self.assertEqual(timing.get_timings(self.request), [])
+
+    def test_signal(self):
+        received = []
+
+        def receiver(sender, request, name, duration, **kwargs):
+            received.append((request, name, duration))
+
+        timing.stage_finished.connect(receiver)
+        try:
+            with timing.stage(self.request, 'stage'):
+                pass
+        finally:
+            timing.stage_finished.disconnect(receiver)
+
+        self.assertEqual(len(received), 1)
+        request, name, duration = received[0]
+        self.assertIs(request, self.request)
+        self.assertEqual(name, 'stage')
+        self.assertGreaterEqual(duration, 0)
+
+    def test_recorded_on_error(self):
+        setattr(self.request, timing.TIMINGS_ATTR, [])
+        with self.assertRaises(ValueError):
+            with timing.stage(self.request, 'stage'):
+                raise ValueError()
+        self.assertEqual(
+            [name for name, _ in timing.get_timings(self.request)],
+            ['stage'],
+        )
+
+    def test_format_server_timing(self):
+        self.assertEqual(
+            timing.format_server_timing([('a', 0.0012), ('b', 1)]),
+            'a;dur=1.2, b;dur=1000.0',
+        )
+
+
+@override_settings(MIDDLEWARE=MIDDLEWARE)
+class ServerTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+
+    def get_stages(self, response):
+        return [
+            metric.split(';')[0]
+            for metric in response['Server-Timing'].split(', ')
+        ]
+
+    def test_login(self):
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'pass',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_stages(response), [
+            'authenticate', 'validate', 'login', 'render', 'total',
+        ])
+
+    def test_signup(self):
+        response = self.client.post(r('rest_auth:signup'), data={
+            'username': 'new-user',
+            'email': 'new-user@localhost',
+            'password1': 'password1!',
+            'password2': 'password1!',
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_stages(response), [
+            'hash_password', 'insert', 'render', 'total',
+        ])
+
+    def test_failed_login(self):
+        response = self.client.post(r('rest_auth:login'), data={
+            'username': 'user', 'password': 'wrong',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.get_stages(response), [
+            'authenticate', 'validate', 'render', 'total',
+        ])
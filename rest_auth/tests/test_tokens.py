@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse as r
+from django.utils.crypto import salted_hmac
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from mock import patch
+from rest_auth.tokens import TokenGenerator, get_timeout
+
+UserModel = get_user_model()
+
+
+class TokenGeneratorTest(TestCase):
+    def setUp(self):
+        self.user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+        self.generator = TokenGenerator()
+
+    def test_check_token(self):
+        token = self.generator.make_token(self.user)
+
+        self.assertIsNotNone(self.generator.parse_token(token))
+        self.assertTrue(self.generator.check_token(self.user, token))
+
+        self.user.set_password('new-password')
+        self.assertFalse(self.generator.check_token(self.user, token))
+
+    def test_malformed_token(self):
+        token = self.generator.make_token(self.user)
+
+        for malformed in ('', 'abcd', 'abcd-efgh', token + '0', token[:-1],
+                          token.upper(), None):
+            self.assertIsNone(self.generator.parse_token(malformed))
+            self.assertFalse(self.generator.check_token(self.user, malformed))
+
+    def test_expired_token(self):
+        token = self.generator.make_token(self.user)
+
+        now = self.generator._now() + get_timeout() + 1
+        with patch.object(TokenGenerator, '_now', return_value=now):
+            self.assertIsNone(self.generator.parse_token(token))
+            self.assertFalse(self.generator.check_token(self.user, token))
+
+    def test_future_token(self):
+        now = self.generator._now() + 3600
+        with patch.object(TokenGenerator, '_now', return_value=now):
+            token = self.generator.make_token(self.user)
+        self.assertIsNone(self.generator.parse_token(token))
+
+    def test_unknown_key_version(self):
+        token = self.generator.make_token(self.user)
+
+        generator = TokenGenerator()
+        generator.secrets = ['another-secret']
+        self.assertIsNone(generator.parse_token(token))
+
+    def test_same_as_salted_hmac(self):
+        timestamp = self.generator._now()
+        token = self.generator._make_token_with_timestamp(self.user, timestamp)
+
+        expected = salted_hmac(
+            TokenGenerator.key_salt,
+            self.generator._make_hash_value(self.user, timestamp),
+            secret=settings.SECRET_KEY,
+        ).hexdigest()[::2]
+        self.assertEqual(token[-20:], expected)
+
+    def test_secret_rotation(self):
+        with override_settings(REST_AUTH_TOKEN_SECRETS=['old']):
+            token = self.generator.make_token(self.user)
+
+        with override_settings(REST_AUTH_TOKEN_SECRETS=['new', 'old']):
+            self.assertTrue(self.generator.check_token(self.user, token))
+            new_token = self.generator.make_token(self.user)
+            self.assertNotEqual(new_token, token)
+            self.assertTrue(self.generator.check_token(self.user, new_token))
+
+        with override_settings(REST_AUTH_TOKEN_SECRETS=['new']):
+            self.assertFalse(self.generator.check_token(self.user, token))
+            self.assertTrue(self.generator.check_token(self.user, new_token))
+
+    def test_keys_are_derived_once(self):
+        with patch.object(TokenGenerator, '_derive_key',
+                          wraps=self.generator._derive_key) as mock:
+            for _ in range(3):
+                token = self.generator.make_token(self.user)
+                self.generator.check_token(self.user, token)
+        self.assertEqual(mock.call_count, 1)
+
+
+class ConfirmViewTokenTest(TestCase):
+    def setUp(self):
+        self.user = user = UserModel._default_manager.create_user(
+            username='user', password='pass', email='user@localhost',
+        )
+        self.uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        expired = TokenGenerator()._now() - get_timeout() - 1
+        with patch.object(TokenGenerator, '_now', return_value=expired):
+            self.expired = TokenGenerator().make_token(user)
+
+    def test_verify_email_confirm(self):
+        for token in ('abcd-efgh', self.expired):
+            url = r('rest_auth:verify_email_confirm', kwargs={
+                'uidb64': self.uidb64, 'token': token,
+            })
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertFalse(response.context['validlink'])
+
+    def test_password_reset_confirm(self):
+        for token in ('abcd-efgh', self.expired):
+            url = r('rest_auth:password_reset_confirm', kwargs={
+                'uidb64': self.uidb64, 'token': token,
+            })
+            with self.assertNumQueries(0):
+                response = self.client.get(url)
+            self.assertFalse(response.context['validlink'])
+
+    def test_valid_token(self):
+        url = r('rest_auth:password_reset_confirm', kwargs={
+            'uidb64': self.uidb64,
+            'token': TokenGenerator().make_token(self.user),
+        })
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response.url.endswith('/set-password/'))
@@ -2,14 +2,16 @@
 from __future__ import unicode_literals
 
 from django.contrib.auth import get_user_model
-from django.contrib.auth.tokens import default_token_generator
+from django.db import connection
 from django.test import TestCase
 from django.test.client import RequestFactory
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse as r
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
+from mock import patch
 from rest_auth.serializers import SignupSerializer
+from rest_auth.tokens import default_token_generator
 from rest_auth.views import (
     EmailVerificationConfirmView,
     UserEmailVerificationMixin,
@@ -148,6 +150,43 @@ class EmailVerificationViewTest(TestCase):
         user.refresh_from_db()
         self.assertTrue(user.is_active)
 
+    def test_success_page_skips_verification(self):
+        user = UserModel._default_manager.create_user(
+            username='test-user', password='pass', is_active=False,
+        )
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        token = default_token_generator.make_token(user)
+
+        response = self.client.get(r(
+            'rest_auth:verify_email_confirm',
+            kwargs=dict(uidb64=uidb64, token=token),
+        ))
+        self.assertEqual(response.status_code, 302)
+
+        with patch.object(EmailVerificationConfirmView, 'get_user') as mock:
+            response = self.client.get(response.url)
+        mock.assert_not_called()
+        self.assertTrue(response.context['validlink'])
+
+    def test_repeated_verification_does_not_write(self):
+        user = UserModel._default_manager.create_user(
+            username='test-user', password='pass',
+        )
+        uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+        token = default_token_generator.make_token(user)
+        url = r(
+            'rest_auth:verify_email_confirm',
+            kwargs=dict(uidb64=uidb64, token=token),
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse([
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "auth_user"')
+        ])
+
     def test_non_user(self):
         self.client.get(
             r('rest_auth:verify_email_confirm',
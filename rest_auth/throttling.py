@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Throttles for authentication views.
+
+Rates are set by ``REST_AUTH_THROTTLE_RATES`` (same format as
+rest_framework's ``DEFAULT_THROTTLE_RATES``), and throttling is disabled
+for scopes whose rate is ``None``.
+
+Unlike rest_framework's ``SimpleRateThrottle``, which stores a list of
+timestamps per client, these throttles use a sliding window counter::
+
+    estimate = previous_window * (1 - elapsed) + current_window
+
+where ``elapsed`` is the elapsed fraction of the current window.
+Counters are incremented atomically by ``REST_AUTH_THROTTLE_BACKEND``,
+so concurrent requests are counted correctly.
+
+Throttles are checked before views run, so throttled requests never reach
+password hashing or database.
+"""
+from __future__ import unicode_literals
+
+import hashlib
+import threading
+
+from django.core.cache import cache as default_cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes
+from rest_framework import throttling
+
+from .conf import auth_settings
+
+
+class CacheBackend(object):
+    """Counters in django's default cache.
+    """
+    cache = default_cache
+
+    def incr(self, key, timeout):
+        """Increments a counter, and creates it if needed.
+
+        :return: the incremented value
+        """
+        if self.cache.add(key, 1, timeout):
+            return 1
+        try:
+            return self.cache.incr(key)
+        except ValueError:
+            # expired between `add` and `incr`
+            self.cache.add(key, 1, timeout)
+            return 1
+
+    def get(self, key):
+        return self.cache.get(key, 0)
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend():
+    """:return: an instance of ``REST_AUTH_THROTTLE_BACKEND`` (shared)
+    """
+    backend_class = auth_settings.THROTTLE_BACKEND
+    with _backends_lock:
+        if backend_class not in _backends:
+            _backends[backend_class] = backend_class()
+        return _backends[backend_class]
+
+
+@receiver(setting_changed)
+def clear_backends(setting, **kwargs):
+    if setting.startswith('REST_AUTH_THROTTLE_'):
+        with _backends_lock:
+            backends = list(_backends.values())
+            _backends.clear()
+        for backend in backends:
+            # e.g. ``SharedMemoryBackend`` holds a file & a mmap.
+            close = getattr(backend, 'close', None)
+            if close is not None:
+                close()
+
+
+def get_data(request, name):
+    data = request.data
+    if not isinstance(data, dict):
+        return ''
+    return data.get(name, '')
+
+
+class SlidingWindowThrottle(throttling.SimpleRateThrottle):
+    """Base class of rest_auth's throttles.
+
+    Subclasses should set ``scope`` and implement ``get_ident_parts``.
+    """
+    cache_format = 'rest_auth:throttle:%(scope)s:%(ident)s'
+
+    def get_rate(self):
+        return auth_settings.THROTTLE_RATES.get(self.scope)
+
+    def get_ident_parts(self, request, view):
+        """:return: a list of strings identifying a client,
+        or ``None`` if the request should not be throttled.
+        """
+        raise NotImplementedError('.get_ident_parts() must be overridden')
+
+    def get_cache_key(self, request, view):
+        parts = self.get_ident_parts(request, view)
+        if parts is None:
+            return None
+
+        ident = '\0'.join(str(part).strip().lower() for part in parts)
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.md5(force_bytes(ident)).hexdigest(),
+        }
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        backend = get_backend()
+        self.now = self.timer()
+        window, elapsed = divmod(self.now, self.duration)
+        self.elapsed = elapsed / self.duration
+
+        # NOTE counting first, and checking later. So requests are counted
+        # correctly even if they are concurrent. (throttled ones too)
+        self.current = backend.incr(
+            '%s:%d' % (self.key, window), 2 * self.duration,
+        )
+        self.previous = backend.get('%s:%d' % (self.key, window - 1))
+
+        estimate = self.previous * (1 - self.elapsed) + self.current
+        return estimate <= self.num_requests
+
+    def wait(self):
+        remaining = 1 - self.elapsed
+        if self.previous and self.current < self.num_requests:
+            # until previous window's weight goes down enough
+            # to count one more request.
+            allowed = (self.num_requests - self.current - 1) / self.previous
+            remaining -= allowed
+        return max(remaining, 0) * self.duration
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    """Throttles login attempts per username & IP address.
+    """
+    scope = 'login'
+
+    def get_ident_parts(self, request, view):
+        return [get_data(request, 'username'), self.get_ident(request)]
+
+
+class PasswordForgotRateThrottle(SlidingWindowThrottle):
+    """Throttles password-reset-requests per email & IP address.
+    """
+    scope = 'forgot'
+
+    def get_ident_parts(self, request, view):
+        return [get_data(request, 'email'), self.get_ident(request)]
+
+
+class SignupRateThrottle(SlidingWindowThrottle):
+    """Throttles sign-ups per IP address.
+    """
+    scope = 'signup'
+
+    def get_ident_parts(self, request, view):
+        return [self.get_ident(request)]
+
+
+class PasswordChangeRateThrottle(SlidingWindowThrottle):
+    """Throttles password changes per user.
+    """
+    scope = 'password_change'
+
+    def get_ident_parts(self, request, view):
+        if not request.user.is_authenticated:
+            return None
+        return [request.user.pk]
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""Stage-level timing of views.
+
+rest_auth's views time named stages of a request. (e.g. ``validate``,
+``authenticate`` and ``login`` of ``LoginView``)
+
+Durations are sent through ``stage_finished`` signal, and (if
+``rest_auth.middleware.ServerTimingMiddleware`` is used) sent to clients in
+``Server-Timing`` header.
+
+.. code-block:: python
+
+    from django.dispatch import receiver
+    from rest_auth.timing import stage_finished
+
+    @receiver(stage_finished)
+    def log_stage(sender, request, name, duration, **kwargs):
+        logger.info('%s %s: %.1fms', request.path, name, duration * 1000)
+
+If nothing receives ``stage_finished`` and the middleware is not used,
+stages are not timed.
+"""
+from __future__ import unicode_literals
+
+from time import perf_counter
+
+from django.dispatch import Signal
+
+TIMINGS_ATTR = '_rest_auth_timings'
+
+stage_finished = Signal()
+"""Sent when a stage is finished. ``duration`` is in seconds.
+(``sender`` is ``None``)
+"""
+
+
+class _Stage(object):
+    __slots__ = ('request', 'name', 'start')
+
+    def __init__(self, request, name):
+        self.request = request
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record(self.request, self.name, perf_counter() - self.start)
+
+
+class _NullStage(object):
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+_null_stage = _NullStage()
+
+
+def is_enabled(request):
+    """:return: ``True`` if stages of ``request`` should be timed.
+    """
+    return bool(
+        stage_finished.receivers or
+        getattr(request, TIMINGS_ATTR, None) is not None
+    )
+
+
+def stage(request, name):
+    """Times the ``with`` block as a stage.
+
+    .. code-block:: python
+
+        with stage(request, 'authenticate'):
+            user = authenticate(...)
+
+    :param request: ``HttpRequest`` or ``rest_framework``'s ``Request``
+    """
+    # NOTE timings are kept in django's request, which is shared by
+    # rest_framework's request & middlewares.
+    request = getattr(request, '_request', request)
+    if request is None or not is_enabled(request):
+        return _null_stage
+    return _Stage(request, name)
+
+
+def record(request, name, duration):
+    """Records ``duration`` (seconds) of a stage.
+    """
+    timings = getattr(request, TIMINGS_ATTR, None)
+    if timings is not None:
+        timings.append((name, duration))
+
+    if stage_finished.receivers:
+        stage_finished.send(
+            sender=None, request=request, name=name, duration=duration,
+        )
+
+
+def get_timings(request):
+    """:return: a list of ``(name, duration)`` recorded for ``request``.
+    """
+    request = getattr(request, '_request', request)
+    return list(getattr(request, TIMINGS_ATTR, None) or [])
+
+
+def format_server_timing(timings):
+    """:return: value of ``Server-Timing`` header. (durations in ms)
+    """
+    return ', '.join(
+        '%s;dur=%.1f' % (name, duration * 1000)
+        for name, duration in timings
+    )
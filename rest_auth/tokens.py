@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Tokens for email verification & password reset links.
+
+A token is ``<timestamp>-<key version><hash>``::
+
+    timestamp: seconds since 2001-01-01, base 36
+    key version: 2 hex digits
+    hash: 20 hex digits of a HMAC of the user's state & timestamp
+
+Its structure, timestamp and key version are checked by ``parse_token``
+before the user is loaded, so malformed or expired tokens cost no query.
+
+Tokens expire in ``PASSWORD_RESET_TIMEOUT`` seconds.
+(``PASSWORD_RESET_TIMEOUT_DAYS`` on django < 3.1)
+
+Secret rotation
+---------------
+
+Set ``REST_AUTH_TOKEN_SECRETS`` to rotate secrets without invalidating
+sent links::
+
+    REST_AUTH_TOKEN_SECRETS = [NEW_SECRET, OLD_SECRET]
+
+Tokens are made with the first one, and checked with all of them. The key
+version of a token tells which secret it was made with. Remove the old
+secret after ``PASSWORD_RESET_TIMEOUT``.
+"""
+from __future__ import unicode_literals
+
+import hashlib
+import hmac
+import re
+import time
+
+from django.conf import global_settings, settings
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.utils.crypto import constant_time_compare
+from django.utils.encoding import force_bytes
+from django.utils.http import int_to_base36
+
+from .conf import auth_settings
+
+TOKEN_RE = re.compile(r'^([0-9a-z]{1,13})-([0-9a-f]{2})([0-9a-f]{20})$')
+EPOCH = 978307200  # 2001-01-01 00:00:00 UTC
+CLOCK_SKEW = 60
+"""Seconds a timestamp can be in the future. (clocks of servers differ)
+"""
+
+
+# NOTE `getattr(settings, ...)` of a missing setting is slow.
+HAS_PASSWORD_RESET_TIMEOUT = hasattr(
+    global_settings, 'PASSWORD_RESET_TIMEOUT',
+)
+
+
+def get_timeout():
+    """:return: seconds tokens are valid for.
+    """
+    if HAS_PASSWORD_RESET_TIMEOUT:
+        return settings.PASSWORD_RESET_TIMEOUT
+    return settings.PASSWORD_RESET_TIMEOUT_DAYS * 24 * 60 * 60
+
+
+class TokenGenerator(PasswordResetTokenGenerator):
+    """django's ``PasswordResetTokenGenerator`` with a parsable token.
+
+    HMAC keys are derived from secrets once, not for each token.
+    """
+    key_salt = 'rest_auth.tokens.TokenGenerator'
+    secrets = None
+    """Secrets to derive keys. (default: ``REST_AUTH_TOKEN_SECRETS``)
+    """
+
+    _keys = ((), [])
+
+    def get_secrets(self):
+        return self.secrets or auth_settings.TOKEN_SECRETS or [self.secret]
+
+    def get_keys(self):
+        """:return: a list of ``(key version, hmac)``.
+            (the first one makes tokens)
+        """
+        secrets = tuple(self.get_secrets())
+        cached_secrets, keys = self._keys
+        if cached_secrets != secrets:
+            keys = [self._derive_key(secret) for secret in secrets]
+            self._keys = (secrets, keys)
+        return keys
+
+    def _derive_key(self, secret):
+        # NOTE same as `salted_hmac`
+        key = hashlib.sha1(force_bytes(self.key_salt + secret)).digest()
+        version = bytearray(hashlib.sha256(key).digest())[0]
+        return version, hmac.new(key, digestmod=hashlib.sha1)
+
+    def make_token(self, user):
+        return self._make_token_with_timestamp(user, self._now())
+
+    def parse_token(self, token):
+        """Checks a token without user. (no query)
+
+        :return: timestamp of the token, or ``None`` if the token is
+            malformed, expired or made with an unknown key.
+        """
+        parsed = self._parse_token(token, self.get_keys())
+        return None if parsed is None else parsed[0]
+
+    def _parse_token(self, token, keys):
+        """:return: (timestamp, key, hash) or ``None``
+        """
+        match = TOKEN_RE.match(token or '')
+        if match is None:
+            return None
+
+        ts_b36, key_version, hash_string = match.groups()
+        key_version = int(key_version, 16)
+        for key in keys:
+            if key[0] == key_version:
+                break
+        else:
+            return None
+
+        # NOTE at most 13 digits. (checked by TOKEN_RE)
+        timestamp = int(ts_b36, 36)
+        age = self._now() - timestamp
+        if not -CLOCK_SKEW <= age <= get_timeout():
+            return None
+        return timestamp, key_version, hash_string
+
+    def check_token(self, user, token):
+        if not (user and token):
+            return False
+
+        keys = self.get_keys()
+        parsed = self._parse_token(token, keys)
+        if parsed is None:
+            return False
+
+        timestamp, key_version, hash_string = parsed
+        value = force_bytes(self._make_hash_value(user, timestamp))
+        # NOTE versions of secrets can collide.
+        for version, key_hmac in keys:
+            if version == key_version and constant_time_compare(
+                self._make_hash(key_hmac, value), hash_string,
+            ):
+                return True
+        return False
+
+    def _make_token_with_timestamp(self, user, timestamp):
+        version, key_hmac = self.get_keys()[0]
+        value = force_bytes(self._make_hash_value(user, timestamp))
+        return '%s-%02x%s' % (
+            int_to_base36(timestamp), version,
+            self._make_hash(key_hmac, value),
+        )
+
+    def _make_hash(self, key_hmac, value):
+        key_hmac = key_hmac.copy()
+        key_hmac.update(value)
+        # Limit to 20 characters to shorten the URL.
+        return key_hmac.hexdigest()[::2]
+
+    def _make_hash_value(self, user, timestamp):
+        login_timestamp = '' if user.last_login is None else \
+            user.last_login.replace(microsecond=0, tzinfo=None)
+        return '%s%s%s%s' % (
+            user.pk, user.password, login_timestamp, timestamp,
+        )
+
+    def _now(self):
+        # Used for mocking in tests
+        return int(time.time()) - EPOCH
+
+
+default_token_generator = TokenGenerator()
@@ -1,14 +1,15 @@
 from collections import OrderedDict
 
-from django.conf import settings
 from django.conf.urls import url
 from rest_framework.routers import APIRootView
 
+from .conf import auth_settings
+from .metrics import metrics_view
 from .views import (
-    EmailVerificationConfirmView, LoginView, LogoutView,
+    EmailVerificationConfirmView, LoginView, LogoutAllView, LogoutView,
     PasswordChangeView, PasswordForgotConfirmView,
     PasswordForgotView, PasswordResetDoneView,
-    SignupView,
+    SignupView, TokenRefreshView,
 )
 
 
@@ -17,11 +18,14 @@ app_name = 'rest_auth'
 urlpatterns = [
     url(r'^login/$', LoginView.as_view(), name='login'),
     url(r'^logout/$', LogoutView.as_view(), name='logout'),
+    url(r'^logout/all/$', LogoutAllView.as_view(), name='logout_all'),
+    url(r'^token/refresh/$', TokenRefreshView.as_view(),
+        name='token_refresh'),
     url(r'^forgot/$', PasswordForgotView.as_view(), name='forgot'),
 
     url(r'^reset/'
         r'(?P<uidb64>[0-9A-Za-z_\-]+)/'
-        r'(?P<token>[0-9A-Za-z]{1,13}-[0-9A-Za-z]{1,20})/$',
+        r'(?P<token>[0-9A-Za-z]{1,13}-[0-9A-Za-z]{1,32})/$',
         PasswordForgotConfirmView.as_view(), name='password_reset_confirm'),
 
     url(r'^reset/d/$',
@@ -35,12 +39,12 @@ urlpatterns = [
     url(r'^signup/$', SignupView.as_view(), name='signup'),
     url(r'^signup/v/'
         r'(?P<uidb64>[0-9A-Za-z_\-]+)/'
-        r'(?P<token>[0-9A-Za-z]{1,13}-[0-9A-Za-z]{1,20})/$',
+        r'(?P<token>[0-9A-Za-z]{1,13}-[0-9A-Za-z]{1,32})/$',
         EmailVerificationConfirmView.as_view(), name='verify_email_confirm'),
 ]
 
 
-if settings.REST_AUTH_API_ROOT_VIEW:
+if auth_settings.API_ROOT_VIEW:
     api_root = OrderedDict()
     for pattern in urlpatterns:
         api_root[pattern.name] = pattern.name
@@ -49,3 +53,8 @@ if settings.REST_AUTH_API_ROOT_VIEW:
         url(r'^$',
             APIRootView.as_view(api_root_dict=api_root), name='api-root'),
     ]
+
+if auth_settings.METRICS_VIEW:
+    urlpatterns += [
+        url(r'^metrics/$', metrics_view, name='metrics'),
+    ]
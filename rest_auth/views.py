@@ -14,12 +14,10 @@ from __future__ import unicode_literals
 
 import functools
 
-from django.conf import settings
 from django.contrib.auth import (
     get_user_model,
     logout as auth_logout,
 )
-from django.contrib.auth.tokens import default_token_generator
 from django.contrib.auth.views import (
     PasswordContextMixin,
     PasswordResetCompleteView,
@@ -31,7 +29,6 @@ from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
 from django.utils.encoding import force_text
 from django.utils.http import urlsafe_base64_decode
-from django.utils.module_loading import import_string
 from django.utils.translation import ugettext_lazy as _
 from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_protect
@@ -43,12 +40,31 @@ from rest_framework import (
     generics, permissions, response, status, views,
 )
 
+from .authentication import (
+    get_database_user,
+    get_request_token,
+    revoke_opaque_token,
+    revoke_user_tokens,
+)
+from .conf import auth_settings
 from .contrib.rest_framework.decorators import sensitive_post_parameters
+from .metrics import MetricsMixin
+from .profiling import ProfilingMixin
 from .serializers import (
     PasswordChangeSerializer,
     PasswordResetSerializer,
     SignupSerializer,
+    TokenRefreshSerializer,
+)
+from .sessions import revoke_user_sessions
+from .throttling import (
+    LoginRateThrottle,
+    PasswordChangeRateThrottle,
+    PasswordForgotRateThrottle,
+    SignupRateThrottle,
 )
+from .timing import stage
+from .tokens import default_token_generator
 
 UserModel = get_user_model()
 
@@ -72,25 +88,32 @@ class LoginMixin(SuccessURLAllowedHostsMixin):
     """
 
     def get_serializer_class(self):
-        serializer_class = import_string(
-            settings.REST_AUTH_LOGIN_SERIALIZER_CLASS
-        )
-        return serializer_class
+        return auth_settings.LOGIN_SERIALIZER_CLASS
 
     def login(self, request, *args, **kwargs):
         """Main business logic for loggin in
 
+        Stages: ``validate`` (includes ``authenticate``) and ``login``.
+        (see ``rest_auth.timing``)
+
         :exception ValidationError: auth failed, but it will be handled\
         by rest_frameworks error handler.
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with stage(request, 'validate'):
+            serializer.is_valid(raise_exception=True)
 
-        serializer.save(request=request)
+        with stage(request, 'login'):
+            serializer.save(request=request)
 
         data = self.get_response_data(serializer.data)
         headers = self.get_success_headers(serializer.data)
 
+        # signed tokens are always sent. (REST_AUTH_LOGIN_MODE = 'signed')
+        tokens = getattr(serializer, 'tokens', None)
+        if tokens:
+            data = dict(data or {}, **tokens)
+
         return response.Response(
             data, status=status.HTTP_200_OK, headers=headers,
         )
@@ -99,7 +122,7 @@ class LoginMixin(SuccessURLAllowedHostsMixin):
         """Override this method when you use ``response_includes_data`` and
         You wanna send customized user data (beyond serializer.data)
         """
-        empty = settings.REST_AUTH_LOGIN_EMPTY_RESPONSE
+        empty = auth_settings.LOGIN_EMPTY_RESPONSE
 
         if not empty:
             return data
@@ -108,9 +131,13 @@ class LoginMixin(SuccessURLAllowedHostsMixin):
         return {}
 
 
-class LoginView(LoginMixin, generics.GenericAPIView):
+class LoginView(MetricsMixin, ProfilingMixin, LoginMixin,
+                generics.GenericAPIView):
     """LoginView for REST-API.
     """
+    query_budget = 6
+    throttle_classes = (LoginRateThrottle, )
+
     @method_decorator(sensitive_post_parameters())
     @method_decorator(csrf_protect)
     @method_decorator(never_cache)
@@ -120,24 +147,69 @@ class LoginView(LoginMixin, generics.GenericAPIView):
         return self.login(request, *args, **kwargs)
 
 
-class LogoutView(views.APIView):
+class LogoutView(MetricsMixin, ProfilingMixin, views.APIView):
     """LogoutView for user logout.
     """
+    query_budget = 5
     permission_classes = (permissions.IsAuthenticated, )
 
     def post(self, request, *args, **kwargs):
         """Logout a user. performed by ``django.contrib.auth.logout``
 
+        Opaque token used for this request is revoked.
         No data is to sent.
         """
+        token = get_request_token(request)
+        if token is not None:
+            revoke_opaque_token(token)
+
         auth_logout(request)
         return response.Response(None, status=status.HTTP_200_OK)
 
 
+class LogoutAllView(MetricsMixin, ProfilingMixin, views.APIView):
+    """Logs a user out of all devices.
+    """
+    query_budget = 7
+    permission_classes = (permissions.IsAuthenticated, )
+
+    def post(self, request, *args, **kwargs):
+        """Revokes all sessions (see ``rest_auth.sessions``) and opaque
+        tokens of the user, and logs out this request.
+        No data is to sent.
+
+        Signed tokens are not revoked. (they aren't stored) Access tokens
+        expire shortly, and refresh tokens are revoked by a password
+        change.
+        """
+        user = get_database_user(request.user)
+        auth_logout(request)
+        revoke_user_sessions(user)
+        revoke_user_tokens(user)
+        return response.Response(None, status=status.HTTP_200_OK)
+
+
+class TokenRefreshView(MetricsMixin, ProfilingMixin,
+                       generics.GenericAPIView):
+    """Issues a new signed access token from a refresh token.
+    (``REST_AUTH_LOGIN_MODE = 'signed'``)
+    """
+    query_budget = 1
+    authentication_classes = ()
+    serializer_class = TokenRefreshSerializer
+
+    @method_decorator(sensitive_post_parameters())
+    @method_decorator(never_cache)
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return response.Response(serializer.data, status=status.HTTP_200_OK)
+
+
 class EmailVerificationMixin(object):
     def get_email_opts(self, **opts):
         email_opts = {}
-        email_opts.update(settings.REST_AUTH_EMAIL_OPTIONS)
+        email_opts.update(auth_settings.EMAIL_OPTIONS)
         email_opts.update(opts)
         return email_opts
 
@@ -149,19 +221,26 @@ class PasswordForgotMixin(EmailVerificationMixin):
 
     def forgot(self, request, *args, **kwargs):
         """Sends a password-reset-link to requested email.
+
+        Stages: ``validate`` and ``send_email``.
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with stage(request, 'validate'):
+            serializer.is_valid(raise_exception=True)
 
         email_opts = self.get_email_opts(request=request)
-        serializer.save(**email_opts)
+        with stage(request, 'send_email'):
+            serializer.save(**email_opts)
 
         return response.Response(None, status=status.HTTP_200_OK)
 
 
-class PasswordForgotView(PasswordForgotMixin, generics.GenericAPIView):
+class PasswordForgotView(MetricsMixin, ProfilingMixin, PasswordForgotMixin,
+                         generics.GenericAPIView):
     """sending password-reset email to user.
     """
+    query_budget = 1
+    throttle_classes = (PasswordForgotRateThrottle, )
 
     def post(self, request, *args, **kwargs):
         """
@@ -169,13 +248,39 @@ class PasswordForgotView(PasswordForgotMixin, generics.GenericAPIView):
         return self.forgot(request, *args, **kwargs)
 
 
-class PasswordForgotConfirmView(PasswordResetConfirmView):
+class PasswordForgotConfirmView(MetricsMixin, ProfilingMixin,
+                                PasswordResetConfirmView):
     """django-rest-auth's password reset confirmation just adopts django's one.
     This idea is under assumption, which password reset confirmation
     should be done, by clicking password-reset-url we sent and moving to
     webpage to change password.
     """
+    query_budget = 3
     success_url = reverse_lazy('rest_auth:password_reset_complete')
+    token_generator = default_token_generator
+    reset_url_token = 'set-password'  # same as django's
+
+    @method_decorator(django_sensitive_post_parameters())
+    @method_decorator(never_cache)
+    def dispatch(self, *args, **kwargs):
+        """Rejects malformed or expired tokens before loading a user.
+        """
+        token = kwargs.get('token')
+        if token != self.reset_url_token and \
+                self.token_generator.parse_token(token) is None:
+            self.validlink = False
+            self.user = None
+            return self.render_to_response(self.get_context_data())
+
+        _super = super(PasswordForgotConfirmView, self)
+        return _super.dispatch(*args, **kwargs)
+
+    def form_valid(self, form):
+        _super = super(PasswordForgotConfirmView, self)
+        response = _super.form_valid(form)
+        revoke_user_tokens(form.user)
+        revoke_user_sessions(form.user)
+        return response
 
 
 class PasswordResetDoneView(PasswordResetCompleteView):
@@ -192,22 +297,36 @@ class PasswordChangeMixin(object):
         # HACK `PasswordChangeSerializer` requires `user` as a first param in
         # __init__, so we should bind it to that class for all HTTP methods.
         klass = super(PasswordChangeMixin, self).get_serializer_class()
-        return functools.partial(klass, self.request.user)
+        return functools.partial(klass, self.get_user())
+
+    def get_user(self):
+        """:return: the user whose password is changed.
+
+        ``TokenUser`` of a signed access token is loaded from database.
+        """
+        return get_database_user(self.request.user)
 
     def reset(self, request, *args, **kwargs):
         """Reset password.
         No data is to sent.
+
+        Stages: ``validate`` (checks the old password) and ``save``.
         """
         serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        with stage(request, 'validate'):
+            serializer.is_valid(raise_exception=True)
+        with stage(request, 'save'):
+            serializer.save()
         return response.Response(None)
 
 
-class PasswordChangeView(PasswordChangeMixin, generics.GenericAPIView):
+class PasswordChangeView(MetricsMixin, ProfilingMixin, PasswordChangeMixin,
+                         generics.GenericAPIView):
     """View for change password.
     """
+    query_budget = 7
     permission_classes = (permissions.IsAuthenticated, )
+    throttle_classes = (PasswordChangeRateThrottle, )
 
     @method_decorator(sensitive_post_parameters())
     @method_decorator(csrf_protect)
@@ -224,19 +343,24 @@ class UserEmailVerificationMixin(EmailVerificationMixin):
         serializer.save(email_opts=email_opts)
 
 
-class SignupView(UserEmailVerificationMixin, generics.CreateAPIView):
+class SignupView(MetricsMixin, ProfilingMixin, UserEmailVerificationMixin,
+                 generics.CreateAPIView):
     """
     """
+    query_budget = 1
     queryset = UserModel._default_manager.all()
     serializer_class = SignupSerializer
+    throttle_classes = (SignupRateThrottle, )
 
 
-class EmailVerificationConfirmView(PasswordContextMixin, TemplateView):
+class EmailVerificationConfirmView(MetricsMixin, ProfilingMixin,
+                                   PasswordContextMixin, TemplateView):
     """Email verification view for newly-created User instances.
 
     After user verified his/her email, users can use his/her full
     features of website.
     """
+    query_budget = 3
     template_name = 'registration/verify_email_confirm.html'
     token_generator = default_token_generator
     title = _('Email Verification')
@@ -247,46 +371,55 @@ class EmailVerificationConfirmView(PasswordContextMixin, TemplateView):
     @method_decorator(django_sensitive_post_parameters())
     @method_decorator(never_cache)
     def dispatch(self, request, *args, **kwargs):
+        """Verifies a token, and redirects to the success page.
+
+        A user is verified when the token is checked, and ``uidb64`` of the
+        user is kept in the session. So the success page is shown
+        without fetching the user or checking the token again.
+        """
         assert 'uidb64' in kwargs and 'token' in kwargs
 
         self.validlink = False
-        self.user = self.get_user(kwargs['uidb64'])
-
-        if self.user is not None:
-            token = kwargs['token']
-            _session = request.session
-
-            if token == self.INTERNAL_VERIFY_URL_TOKEN:
-                session_token = _session.get(
-                    self.INTERNAL_VERIFY_SESSION_TOKEN
+        uidb64 = kwargs['uidb64']
+        token = kwargs['token']
+        _session = request.session
+
+        if token == self.INTERNAL_VERIFY_URL_TOKEN:
+            if _session.get(self.INTERNAL_VERIFY_SESSION_TOKEN) == uidb64:
+                # Show email verification is successful.
+                self.validlink = True
+                _super = super(EmailVerificationConfirmView, self)
+                return _super.dispatch(request, *args, **kwargs)
+        elif self.token_generator.parse_token(token) is not None:
+            # NOTE user is loaded only for well-formed, unexpired tokens.
+            self.user = self.get_user(uidb64)
+            if self.user is not None and \
+                    self.token_generator.check_token(self.user, token):
+                self.set_user_as_verified(self.user)
+
+                # Store verified user in the session and redirect to
+                # the email-verification-success view w/o token.
+                # (For avoiding leaking tokens in HTTP referer)
+                _session[self.INTERNAL_VERIFY_SESSION_TOKEN] = uidb64
+
+                redir_url = request.path.replace(
+                    token, self.INTERNAL_VERIFY_URL_TOKEN
                 )
-                if self.token_generator.check_token(self.user, session_token):
-                    # If token is valid, show email verification is successful.
-                    self.validlink = True
-                    _super = super(EmailVerificationConfirmView, self)
-                    return _super.dispatch(request, *args, **kwargs)
-            else:
-                if self.token_generator.check_token(self.user, token):
-                    # Store token in the session and redirect to
-                    # the email-verification-success view w/o token.
-                    # (For avoiding leaking tokens in HTTP referer)
-                    _session[self.INTERNAL_VERIFY_SESSION_TOKEN] = token
-
-                    redir_url = request.path.replace(
-                        token, self.INTERNAL_VERIFY_URL_TOKEN
-                    )
-                    return HttpResponseRedirect(redir_url)
+                return HttpResponseRedirect(redir_url)
 
         return self.render_to_response(self.get_context_data())
 
-    def get(self, request, *args, **kwargs):
-        self.set_user_as_verified(self.user)
-        _super = super(EmailVerificationConfirmView, self)
-        return _super.get(request, *args, **kwargs)
-
     def set_user_as_verified(self, user):
+        """Activates a user. (no query if already active)
+        """
+        if user.is_active:
+            return
+
+        # NOTE conditional, so concurrent clicks write once.
+        UserModel._default_manager.filter(
+            pk=user.pk, is_active=False,
+        ).update(is_active=True)
         user.is_active = True
-        user.save(update_fields=['is_active'])
 
     def get_user(self, uidb64):
         try: